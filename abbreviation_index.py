@@ -0,0 +1,98 @@
+from types import MappingProxyType
+
+from config import FUZZY_MAX_DISTANCE
+
+
+def normalize_term(term: str) -> str:
+    return term.replace(",", "").replace(".", "").replace(" ", "").lower()
+
+
+def edit_distance(a: str, b: str) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        previous = current
+    return previous[-1]
+
+
+class BKTree:
+    """Burkhard-Keller tree over the normalized keys for edit-distance queries."""
+
+    def __init__(self, words=()):
+        self.root = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        if self.root is None:
+            self.root = (word, {})
+            return
+        node = self.root
+        while True:
+            distance = edit_distance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+
+    def search(self, word, max_distance):
+        """All (distance, key) pairs within max_distance, closest first."""
+        if self.root is None:
+            return []
+        found = []
+        stack = [self.root]
+        while stack:
+            key, children = stack.pop()
+            distance = edit_distance(word, key)
+            if distance <= max_distance:
+                found.append((distance, key))
+            low, high = distance - max_distance, distance + max_distance
+            stack.extend(child for d, child in children.items() if low <= d <= high)
+        return sorted(found)
+
+
+class AbbreviationIndex:
+    """
+    Normalized abbr -> entry hash index (first entry wins, like the old linear
+    scan), with a BK-tree fallback for near-miss queries.
+    """
+
+    def __init__(self, entries, max_distance=FUZZY_MAX_DISTANCE):
+        by_key = {}
+        for item in entries:
+            key = normalize_term(item.get("abbr", ""))
+            if key and key not in by_key:
+                by_key[key] = item
+        self.entries = MappingProxyType(by_key)
+        self.max_distance = max_distance
+        self.tree = BKTree(by_key)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, term):
+        return self.entries.get(normalize_term(term))
+
+    def lookup(self, term):
+        """Return (entry, distance); distance 0 is an exact hit, (None, None) means no match."""
+        key = normalize_term(term)
+        item = self.entries.get(key)
+        if item is not None:
+            return item, 0
+        if self.max_distance > 0 and key:
+            matches = self.tree.search(key, self.max_distance)
+            if matches:
+                distance, match = matches[0]
+                return self.entries[match], distance
+        return None, None
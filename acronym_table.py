@@ -0,0 +1,159 @@
+"""
+Precomputed abbreviation mnemonics for short acronyms (A-Z, up to
+ACRONYM_TABLE_MAX_LEN letters), so GET /api/tricks?type=abbreviations is a
+table lookup plus one random pick. Longer or unusual inputs fall back to
+live generation. Build offline from data.json:
+
+    python acronym_table.py [max_len]
+
+Layout (little-endian), every key of a length stored in order, so a key's
+position is arithmetic and no per-key index is needed:
+    header   magic, version, max_len, variants, id width, string count, offsets
+    ids      per length L = 1..max_len: 26**L keys x variants x L word ids
+             (noun on even, preposition on odd positions; all-ones = no words)
+    offsets  u32[n_strings + 1] into the blob
+    blob     utf-8 words
+"""
+import itertools
+import mmap
+import random
+import struct
+import string
+import sys
+from array import array
+from functools import lru_cache
+from pathlib import Path
+
+from config import ACRONYM_TABLE_MAX_LEN, ACRONYM_TABLE_VARIANTS
+
+MAGIC = b"TRKACRO1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIIIQQQ")
+ALPHABET = string.ascii_uppercase
+CODES = {letter: code for code, letter in enumerate(ALPHABET)}
+
+
+def _word_lists(bank, sid):
+    """LETTER -> tuple of string ids, falling back exactly like live generation does."""
+    from data_registry import bank_words  # data_registry imports this module
+
+    return {letter: tuple(sid(w) for w in bank_words(bank, letter)) for letter in ALPHABET}
+
+
+def build(path, nouns, prepositions, max_len=ACRONYM_TABLE_MAX_LEN, variants=ACRONYM_TABLE_VARIANTS, seed=0):
+    strings = {}
+
+    def sid(word):
+        if word not in strings:
+            strings[word] = len(strings)
+        return strings[word]
+
+    by_parity = (_word_lists(nouns, sid), _word_lists(prepositions, sid))
+    typecode = "H" if len(strings) < 0xFFFF else "I"
+    missing = 0xFFFF if typecode == "H" else 0xFFFFFFFF
+    rng = random.Random(seed)
+
+    ids = array(typecode)
+    for length in range(1, max_len + 1):
+        empty = [missing] * (variants * length)
+        for key in itertools.product(ALPHABET, repeat=length):
+            lists = [by_parity[pos % 2][letter] for pos, letter in enumerate(key)]
+            if not all(lists):
+                ids.extend(empty)
+                continue
+            columns = [rng.choices(words, k=variants) for words in lists]
+            for variant in zip(*columns):
+                ids.extend(variant)
+
+    blob = bytearray()
+    offsets = array("I", [0])
+    for word in strings:
+        blob += word.encode("utf-8")
+        offsets.append(len(blob))
+    if sys.byteorder != "little":
+        ids.byteswap()
+        offsets.byteswap()
+
+    ids_pos = HEADER.size
+    offsets_pos = ids_pos + len(ids) * ids.itemsize
+    blob_pos = offsets_pos + len(offsets) * 4
+    header = HEADER.pack(MAGIC, VERSION, max_len, variants, ids.itemsize, len(strings),
+                         ids_pos, offsets_pos, blob_pos)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(ids.tobytes())
+        f.write(offsets.tobytes())
+        f.write(blob)
+    tmp.replace(path)
+    return path
+
+
+class AcronymTable:
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.max_len, self.variants, width, n_strings,
+         ids_pos, offsets_pos, blob_pos) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{self.path} is not a v{VERSION} acronym table")
+
+        view = memoryview(self._mmap)
+        self._ids = self._cast(view[ids_pos:offsets_pos], "H" if width == 2 else "I")
+        self._offsets = self._cast(view[offsets_pos:blob_pos], "I")
+        self._blob = view[blob_pos:]
+        self._missing = (1 << (8 * width)) - 1
+        self._word = lru_cache(maxsize=65536)(self._decode)
+
+        # Where each length's block starts, in ids
+        self._starts = {}
+        start = 0
+        for length in range(1, self.max_len + 1):
+            self._starts[length] = start
+            start += 26 ** length * self.variants * length
+
+    @staticmethod
+    def _cast(view, typecode):
+        if sys.byteorder == "little":
+            return view.cast(typecode)
+        values = array(typecode, view.tobytes())
+        values.byteswap()
+        return values
+
+    def _decode(self, sid):
+        return str(self._blob[self._offsets[sid]:self._offsets[sid + 1]], "utf-8")
+
+    def pick(self, letters, rng=random):
+        """One precomputed word per letter, or None when the input is not in the table."""
+        length = len(letters)
+        if not 0 < length <= self.max_len:
+            return None
+        key = 0
+        for letter in letters:
+            code = CODES.get(letter)
+            if code is None:
+                return None
+            key = key * 26 + code
+        start = self._starts[length] + (key * self.variants + rng.randrange(self.variants)) * length
+        ids = self._ids[start:start + length]
+        if ids[0] == self._missing:
+            return None
+        return [self._word(sid) for sid in ids]
+
+
+def main(argv=None):
+    import data_registry
+
+    max_len = int(argv[0]) if argv else ACRONYM_TABLE_MAX_LEN
+    snapshot = data_registry.build_snapshot()
+    path = build(data_registry.ACRONYM_TABLE_FILE, snapshot.nouns, snapshot.prepositions, max_len)
+    print(f"Wrote {path} ({path.stat().st_size} bytes, acronyms up to {max_len} letters)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,250 @@
+"""
+Admission control: keeps slow routes (external lookups, sentence generation,
+batches) from taking every worker thread and queueing the cheap ones behind
+them.
+
+Each request is matched to a route pool (ADMISSION_LIMITS) holding at most
+`limit` requests at once. Extra requests wait in a bounded FIFO queue; one
+that would not get a slot within ADMISSION_WAIT seconds (queue full, timed
+out, or predicted from the pool's recent service time) is answered with a 503
+and a Retry-After straight away. Independently, every client has a token
+bucket; an empty bucket means a 429. A client is its peer address, or the
+nearest X-Forwarded-For hop when the peer is one of ADMISSION_TRUSTED_PROXIES.
+"""
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict, deque
+
+import metrics
+from config import (
+    ADMISSION_BURST,
+    ADMISSION_LIMITS,
+    ADMISSION_MAX_CLIENTS,
+    ADMISSION_QUEUE,
+    ADMISSION_RATE,
+    ADMISSION_TRUSTED_PROXIES,
+    ADMISSION_WAIT,
+)
+
+# Never limited or rate-limited: operators must reach these during an overload
+EXEMPT = ("/metrics", "/admin", "/docs", "/redoc", "/openapi.json")
+# Same handler as /api/tricks (see routes/dispatcher.py)
+ALIASES = {"/api/v1/tricks": "/api/tricks"}
+# Weight of the newest request in a pool's average service time
+EWMA_ALPHA = 0.2
+
+
+class Rejected(Exception):
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def parse_limits(spec):
+    """'/wiki=4,/api/tricks?type=nickname=8' -> {'/wiki': 4, '/api/tricks?type=nickname': 8}"""
+    limits = {}
+    for part in spec.split(","):
+        name, _, limit = part.strip().rpartition("=")
+        if name and limit.strip():
+            limits[name] = int(limit)
+    return limits
+
+
+class RoutePool:
+    """A concurrency limit with a bounded, deadline-aware wait queue."""
+
+    def __init__(self, name, limit, queue_size=ADMISSION_QUEUE, max_wait=ADMISSION_WAIT):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.active = 0
+        self.service_time = 0.0   # EWMA of seconds per request
+        self._waiters = deque()
+
+    def expected_wait(self, position):
+        """Seconds until the request at queue `position` (0 = next) gets a slot, at the recent pace."""
+        return (position // self.limit + 1) * self.service_time
+
+    async def acquire(self):
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        position = len(self._waiters)
+        if position >= self.queue_size:
+            raise Rejected("queue_full", self.expected_wait(position))
+        if self.expected_wait(position) > self.max_wait:
+            raise Rejected("deadline", self.expected_wait(position))
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                return  # the slot was handed over just as the deadline passed
+            self._forget(waiter)
+            raise Rejected("timeout", self.expected_wait(len(self._waiters)))
+        except asyncio.CancelledError:
+            if waiter.done():
+                self.release()
+            else:
+                self._forget(waiter)
+            raise
+
+    def _forget(self, waiter):
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self, elapsed=None):
+        if elapsed is not None:
+            self.service_time += EWMA_ALPHA * (elapsed - self.service_time)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # hand the slot over; `active` is unchanged
+                return
+        self.active -= 1
+
+    def stats(self):
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": len(self._waiters),
+            "service_time": round(self.service_time, 4),
+        }
+
+
+def client_key(scope, trusted_proxies):
+    """
+    Bucket key for a request: the peer address, unless the peer is a trusted
+    proxy, in which case the rightmost X-Forwarded-For hop that is not itself
+    a trusted proxy (hops further left are client-supplied and can be forged).
+    """
+    client = scope.get("client")
+    peer = client[0] if client else ""
+    if peer not in trusted_proxies:
+        return peer
+    for name, value in scope.get("headers", ()):
+        if name == b"x-forwarded-for":
+            for hop in reversed(value.decode("latin-1").split(",")):
+                hop = hop.strip()
+                if hop and hop not in trusted_proxies:
+                    return hop
+    return peer
+
+
+class TokenBuckets:
+    """Per-client token buckets, least recently seen clients dropped beyond `max_clients`."""
+
+    def __init__(self, rate=ADMISSION_RATE, burst=ADMISSION_BURST, max_clients=ADMISSION_MAX_CLIENTS):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()   # client -> (tokens, updated at)
+
+    def take(self, client):
+        """Spend one token; returns 0 when allowed, else seconds until the next token."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        allowed = tokens >= 1
+        self._buckets[client] = (tokens - 1 if allowed else tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return 0 if allowed else (1 - tokens) / self.rate
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware applying the route pools and client token buckets."""
+
+    def __init__(self, app, limits=ADMISSION_LIMITS, buckets=None, trusted_proxies=ADMISSION_TRUSTED_PROXIES):
+        self.app = app
+        self.trusted_proxies = frozenset(p.strip() for p in trusted_proxies.split(",") if p.strip())
+        self.pools = {name: RoutePool(name, limit) for name, limit in parse_limits(limits).items()}
+        self.buckets = buckets if buckets is not None else (TokenBuckets() if ADMISSION_RATE > 0 else None)
+        # Longest prefix first, so /api/tricks/batch is not caught by /api/tricks
+        self._prefixes = sorted((name for name in self.pools if "?" not in name), key=len, reverse=True)
+        _middlewares.append(self)
+
+    def pool_for(self, scope):
+        path = scope["path"]
+        path = ALIASES.get(path, path)
+        for part in scope.get("query_string", b"").decode("latin-1").split("&"):
+            if part.startswith("type="):
+                pool = self.pools.get(f"{path}?{part}")
+                if pool is not None:
+                    return pool
+                break
+        for prefix in self._prefixes:
+            if path.startswith(prefix):
+                return self.pools[prefix]
+        return None
+
+    async def __call__(self, scope, receive, send):
+        # Preflights are answered by CORSMiddleware and must not spend a client's tokens
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"].startswith(EXEMPT):
+            await self.app(scope, receive, send)
+            return
+
+        pool = self.pool_for(scope)
+        if self.buckets is not None:
+            wait = self.buckets.take(client_key(scope, self.trusted_proxies))
+            if wait:
+                metrics.ADMISSION_REJECTED.inc(pool=pool.name if pool else "", reason="rate_limited")
+                await _reject(send, 429, "Too many requests", wait)
+                return
+        if pool is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await pool.acquire()
+        except Rejected as e:
+            metrics.ADMISSION_REJECTED.inc(pool=pool.name, reason=e.reason)
+            await _reject(send, 503, "Server busy, retry later", e.retry_after)
+            return
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            pool.release(time.perf_counter() - start)
+
+    def stats(self):
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+
+async def _reject(send, status, detail, retry_after):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+_middlewares = []
+
+
+def _pool_stats():
+    values = {}
+    for middleware in _middlewares:
+        for name, stats in middleware.stats().items():
+            for stat in ("limit", "active", "queued"):
+                values[(name, stat)] = stats[stat]
+    return values
+
+
+POOL_STATS = metrics.register(metrics.Gauge(
+    "admission_pool", "Admission pool limit/active/queued requests", ("pool", "stat"), _pool_stats))
@@ -0,0 +1,109 @@
+"""
+Usage (from the repo root):
+
+    python -m benchmarks --scale 10
+    python -m benchmarks --scale 1 --save benchmarks/baselines/scale-1.json
+    python -m benchmarks --scale 1 --compare benchmarks/baselines/scale-1.json --fail-on-regression
+    python -X importtime -c "import main" 2> importtime.log   # full per-module breakdown
+"""
+import argparse
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import config  # noqa: E402
+from benchmarks import load, micro, startup, synthetic  # noqa: E402
+
+# Metrics worth comparing, and whether bigger is better
+COMPARED = {"mean_us": False, "p50_us": False, "p99_us": False,
+            "p50_ms": False, "p95_ms": False, "p99_ms": False, "req_per_s": True,
+            "import_ms": False, "first_load_ms": False}
+
+
+def compare(current, baseline, threshold):
+    """Print current vs baseline per metric; return the list of regressions beyond `threshold`."""
+    regressions = []
+    for section in ("startup", "micro", "load"):
+        for name, stats in current.get(section, {}).items():
+            if stats.get("errors"):
+                # Failed requests make every latency/throughput figure meaningless
+                print(f"{section}/{name}.errors: {stats['errors']}  REGRESSION")
+                regressions.append(f"{section}/{name}.errors")
+            base = baseline.get(section, {}).get(name)
+            if not base:
+                continue
+            for metric, higher_is_better in COMPARED.items():
+                if metric not in stats or not base.get(metric):
+                    continue
+                ratio = stats[metric] / base[metric]
+                worse = ratio < 1 - threshold if higher_is_better else ratio > 1 + threshold
+                flag = "  REGRESSION" if worse else ""
+                print(f"{section}/{name}.{metric}: {base[metric]} -> {stats[metric]} ({ratio:.2f}x){flag}")
+                if worse:
+                    regressions.append(f"{section}/{name}.{metric}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trick API benchmarks")
+    parser.add_argument("--scale", type=int, default=1, help="data size multiplier (1, 10, 100, 1000)")
+    parser.add_argument("--iterations", type=int, default=2000, help="calls per micro benchmark")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per load scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--cached", action="store_true", help="let the response cache answer repeats")
+    parser.add_argument("--skip-startup", action="store_true", help="don't measure cold-start import/load time")
+    parser.add_argument("--save", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory(prefix="trick-bench-") as scratch:
+        start = time.perf_counter()
+        synthetic.activate(synthetic.build(scratch, args.scale))
+        load_seconds = time.perf_counter() - start
+
+        # The load generator is one client firing as fast as it can: measure the
+        # app, not the per-client rate limit and load shedding in front of it
+        config.ADMISSION_ENABLED = False
+        import main as app_module
+
+        results = {
+            "meta": {
+                "scale": args.scale,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "data_build_and_load_s": round(load_seconds, 3),
+            },
+            # Fresh interpreters on the repo's own data files, not the synthetic set
+            "startup": {} if args.skip_startup else startup.run(),
+            "micro": micro.run(args.iterations),
+            "load": load.run(app_module.app, args.requests, args.concurrency, unique=not args.cached),
+        }
+
+    print(json.dumps(results, indent=2))
+
+    if args.save:
+        Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.save).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+        if regressions and args.fail_on_regression:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
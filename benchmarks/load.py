@@ -0,0 +1,86 @@
+"""In-process ASGI load generator: no sockets, so it measures the app rather than the network."""
+import asyncio
+import itertools
+import time
+
+import httpx
+
+from .synthetic import SEARCH_CATEGORY
+
+# Untimed requests per scenario first, so lazy imports, index builds and cold
+# caches land on these instead of on whichever scenario happens to run first
+WARMUP = 50
+
+SCENARIOS = {
+    "tricks_abbreviations": ("GET", "/api/tricks", [
+        {"type": "abbreviations", "letters": letters} for letters in ("CPU", "RAM", "GPU", "HTTP", "A,B,C,D")
+    ]),
+    "tricks_generate_sentence": ("GET", "/api/tricks", [
+        {"type": "generate_sentence", "letters": letters} for letters in ("CPU", "RAM", "SMTP", "Akash,Tilak,Patal")
+    ]),
+    "search": ("GET", "/search/", [
+        {"category": SEARCH_CATEGORY, "query": query} for query in ("an", "ter", "ola", "x")
+    ]),
+}
+
+
+def _percentile(sorted_samples, pct):
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(round(pct / 100 * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+async def _run_scenario(app, method, path, param_sets, requests, concurrency, unique, warmup=WARMUP):
+    transport = httpx.ASGITransport(app=app)
+    params = itertools.cycle(param_sets)
+    counter = itertools.count()
+    seeds = itertools.count()
+    latencies = []
+    errors = 0
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        def next_query():
+            query = dict(next(params))
+            if unique:
+                # Distinct seeds defeat the response cache so every request does real work
+                query["seed"] = str(next(seeds))
+            return query
+
+        async def worker():
+            nonlocal errors
+            while next(counter) < requests:
+                query = next_query()
+                start = time.perf_counter()
+                response = await client.request(method, path, params=query)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors += 1
+
+        for _ in range(warmup):
+            await client.request(method, path, params=next_query())
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "errors": errors,
+        "req_per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def run(app, requests=2000, concurrency=16, unique=True, scenarios=None):
+    results = {}
+    for name in scenarios or SCENARIOS:
+        method, path, param_sets = SCENARIOS[name]
+        results[name] = asyncio.run(
+            _run_scenario(app, method, path, param_sets, requests, concurrency, unique and path == "/api/tricks")
+        )
+    return results
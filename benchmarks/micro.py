@@ -0,0 +1,63 @@
+"""Function-level benchmarks; each returns per-call latency stats in microseconds."""
+import itertools
+import statistics
+import time
+
+import cache
+import data_registry
+from routes.generate_template_sentence import extract_placeholders, generate_template_sentence
+from routes.tricks import extract_letters
+
+INPUTS = ["CPU", "ram", "Akash,Tilak,Patal", "HyperTextMarkupLanguage", "a,b,c,d,e", "World Health Organization"]
+
+
+def _measure(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "iterations": iterations,
+        "mean_us": round(statistics.fmean(samples) * 1e6, 3),
+        "p50_us": round(samples[len(samples) // 2] * 1e6, 3),
+        "p99_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6, 3),
+    }
+
+
+def bench_extract_letters(iterations):
+    inputs = itertools.cycle(INPUTS)
+    return _measure(lambda: extract_letters(next(inputs)), iterations)
+
+
+def bench_extract_placeholders(iterations):
+    templates = itertools.cycle(data_registry.get().templates)
+    return _measure(lambda: extract_placeholders(next(templates)), iterations)
+
+
+def bench_generate_template_sentence(iterations):
+    data = data_registry.get()
+    templates = itertools.cycle(data.templates)
+    letters = list("CPUDB")
+    return _measure(lambda: generate_template_sentence(next(templates), data.wordbank_index, letters), iterations)
+
+
+def bench_save_to_cache(iterations):
+    counter = itertools.count()
+    return _measure(
+        lambda: cache.save_to_cache({"abbr": f"BENCH{next(counter)}", "full_form": "x", "description": "y"}),
+        iterations,
+    )
+
+
+BENCHMARKS = {
+    "extract_letters": bench_extract_letters,
+    "extract_placeholders": bench_extract_placeholders,
+    "generate_template_sentence": bench_generate_template_sentence,
+    "cache.save_to_cache": bench_save_to_cache,
+}
+
+
+def run(iterations=2000):
+    return {name: fn(iterations) for name, fn in BENCHMARKS.items()}
@@ -0,0 +1,60 @@
+"""
+Cold-start cost, measured in fresh interpreters: `import main` wall time, the
+`-X importtime` breakdown (heaviest modules), and the first data load.
+"""
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+PROBE = """
+import time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+import data_registry
+data_registry.load()
+loaded = time.perf_counter()
+print(imported - start, loaded - imported)
+"""
+
+
+def _python(args, env=None):
+    return subprocess.run(
+        [sys.executable, *args], cwd=BASE_DIR, capture_output=True, text=True, check=True,
+        env={**os.environ, "LOG_LEVEL": "WARNING", **(env or {})},
+    )
+
+
+def import_profile(top=10):
+    """Top-level modules pulled in by `import main`, by cumulative import time (us)."""
+    stderr = _python(["-X", "importtime", "-c", "import main"]).stderr
+    cumulative = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) <= 3:  # direct imports of main (and main itself)
+            cumulative[match.group(4)] = int(match.group(2))
+    heaviest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {"main_us": cumulative.get("main", 0), "heaviest": dict(heaviest)}
+
+
+def run(repeats=3, env=None):
+    samples = []
+    for _ in range(repeats):
+        imported, loaded = map(float, _python(["-c", PROBE], env).stdout.split())
+        samples.append((imported, loaded))
+    profile = import_profile()
+    return {
+        "import_main": {
+            "repeats": repeats,
+            "import_ms": round(min(s[0] for s in samples) * 1000, 3),
+            "first_load_ms": round(min(s[1] for s in samples) * 1000, 3),
+            "importtime_main_ms": round(profile["main_us"] / 1000, 3),
+            "heaviest_imports_ms": {name: round(us / 1000, 3) for name, us in profile["heaviest"].items()},
+        }
+    }
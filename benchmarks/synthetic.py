@@ -0,0 +1,87 @@
+"""
+Synthetic data scaled up from the real files, written to a scratch directory
+and wired into the app modules (registry paths, DATA_PATH, cache store).
+"""
+import json
+import random
+import string
+from pathlib import Path
+
+import cache
+import data_registry
+import search_index
+import utils
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SEARCH_CATEGORY = "bench_names"
+BASE_SEARCH_ITEMS = 1000
+
+
+def _scale_banks(banks: dict, factor: int) -> dict:
+    """Each letter's word list grows `factor`x with suffixed variants of the real words."""
+    scaled = {}
+    for category, letters in banks.items():
+        if not isinstance(letters, dict):
+            scaled[category] = letters
+            continue
+        scaled[category] = {
+            letter: words + [f"{word}{i}" for i in range(1, factor) for word in words]
+            for letter, words in letters.items()
+        }
+    return scaled
+
+
+def _names(count: int, rng: random.Random) -> list:
+    def word():
+        return rng.choice(string.ascii_uppercase) + "".join(
+            rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9))
+        )
+    return [f"{word()} {word()}" for _ in range(count)]
+
+
+def build(target_dir, factor: int = 1, seed: int = 7) -> Path:
+    """Write wordbank.json, data.json, templates and data/*.json at `factor`x size into target_dir."""
+    target = Path(target_dir)
+    (target / "data").mkdir(parents=True, exist_ok=True)
+    (target / "routes").mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+
+    for name in ("wordbank.json", "data.json"):
+        with open(BASE_DIR / name, encoding="utf-8") as f:
+            raw = json.load(f)
+        with open(target / name, "w", encoding="utf-8") as f:
+            json.dump(_scale_banks(raw, factor), f)
+
+    templates = (BASE_DIR / "routes" / "English_templates.json").read_text(encoding="utf-8")
+    (target / "routes" / "English_templates.json").write_text(templates, encoding="utf-8")
+    nicknames = (BASE_DIR / "nickname_templates.json").read_text(encoding="utf-8")
+    (target / "nickname_templates.json").write_text(nicknames, encoding="utf-8")
+
+    with open(target / "data" / f"{SEARCH_CATEGORY}.json", "w", encoding="utf-8") as f:
+        json.dump(_names(BASE_SEARCH_ITEMS * factor, rng), f)
+    with open(target / "data" / "abbreviations.json", "w", encoding="utf-8") as f:
+        json.dump({}, f)
+    return target
+
+
+def activate(target_dir) -> None:
+    """Point the registry, search and abbreviation cache at the synthetic files and load them."""
+    target = Path(target_dir)
+    data_registry.DATA_FILES.update({
+        "abbreviations": target / "data.json",
+        "wordbank": target / "wordbank.json",
+        "templates": target / "routes" / "English_templates.json",
+        "nicknames": target / "nickname_templates.json",
+    })
+    data_registry.SNAPSHOT_FILE = target / "data" / "snapshot.bin"
+    data_registry.ACRONYM_TABLE_FILE = target / "data" / "acronyms.bin"
+    data_dir = str(target / "data") + "/"
+    utils.DATA_PATH = data_dir
+    search_index.DATA_PATH = data_dir
+    search_index.clear()
+    cache.store = cache.AbbreviationStore(
+        target / "data" / "abbreviations.json",
+        target / "data" / "abbreviations.log",
+        target / "data" / "abbreviations.lock",
+    )
+    data_registry.load()
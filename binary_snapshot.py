@@ -0,0 +1,196 @@
+"""
+Compact binary snapshot of data.json, wordbank.json (+ precomputed plurals)
+and the sentence and nickname templates, opened with mmap so every worker
+shares the same pages through the OS page cache. JSON stays the source of truth; rebuild with
+
+    python binary_snapshot.py            # writes data_registry.SNAPSHOT_FILE
+
+Layout (little-endian):
+    header   magic, version, counts, section offsets
+    records  (section, category sid, letter sid, start, count) per word list
+    ids      u32 string ids, the word lists back to back
+    offsets  u32[n_strings + 1] into the blob
+    blob     utf-8 of every distinct string, stored once
+"""
+import json
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from functools import lru_cache
+from pathlib import Path
+
+from config import SNAPSHOT_DECODE_CACHE, SNAPSHOT_PATH
+
+MAGIC = b"TRKSNAP1"
+VERSION = 2
+HEADER = struct.Struct("<8sIIIIQQQQ")
+RECORD = struct.Struct("<IIIII")
+
+# Sections
+BANKS = 1              # data.json: category -> letter -> words
+WORDS = 2              # wordbank.json: category -> letter -> words
+PLURALS = 3            # plural forms for WORDS, same shape
+TEMPLATES = 4          # category = length group, letter = ""
+ENTRIES = 5            # data.json list entries as JSON strings
+FALLBACK_PLURALS = 6   # category = part of speech, letter = ""
+NICKNAMES = 7          # nickname templates, all under category ""
+
+
+class _Writer:
+    def __init__(self):
+        self.strings = {}
+        self.records = []
+        self.ids = array("I")
+
+    def sid(self, text):
+        if text not in self.strings:
+            self.strings[text] = len(self.strings)
+        return self.strings[text]
+
+    def add(self, section, category, letter, words):
+        start = len(self.ids)
+        self.ids.extend(self.sid(word) for word in words)
+        self.records.append((section, self.sid(category), self.sid(letter), start, len(words)))
+
+    def add_banks(self, section, banks):
+        for category, letters in banks.items():
+            if isinstance(letters, Mapping):
+                for letter, words in letters.items():
+                    self.add(section, category, letter, words)
+
+    def write(self, path):
+        blob = bytearray()
+        offsets = array("I", [0])
+        for text in self.strings:  # dicts keep insertion order == sid order
+            blob += text.encode("utf-8")
+            offsets.append(len(blob))
+        records = b"".join(RECORD.pack(*r) for r in self.records)
+        if sys.byteorder != "little":
+            self.ids.byteswap()
+            offsets.byteswap()
+
+        records_pos = HEADER.size
+        ids_pos = records_pos + len(records)
+        offsets_pos = ids_pos + len(self.ids) * 4
+        blob_pos = offsets_pos + len(offsets) * 4
+        header = HEADER.pack(MAGIC, VERSION, len(self.strings), len(self.records), len(self.ids),
+                             records_pos, ids_pos, offsets_pos, blob_pos)
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(header)
+            f.write(records)
+            f.write(self.ids.tobytes())
+            f.write(offsets.tobytes())
+            f.write(blob)
+        tmp.replace(path)
+        return path
+
+
+def write_snapshot(path, banks, wordbank_index, templates_by_length, entries, nickname_templates=()):
+    """Serialize already-normalized data (as built by data_registry) to `path`."""
+    writer = _Writer()
+    writer.add_banks(BANKS, banks)
+    writer.add_banks(WORDS, wordbank_index.categories)
+    writer.add_banks(PLURALS, wordbank_index.plurals)
+    for base, words in wordbank_index.fallback_plurals.items():
+        writer.add(FALLBACK_PLURALS, base, "", words)
+    for length, templates in templates_by_length.items():
+        writer.add(TEMPLATES, length, "", templates)
+    writer.add(ENTRIES, "", "", [json.dumps(dict(e), ensure_ascii=False) for e in entries])
+    writer.add(NICKNAMES, "", "", nickname_templates)
+    return writer.write(path)
+
+
+class MappedLetters(Mapping):
+    """letter -> tuple of words for one category, decoded from the mmap on access."""
+
+    def __init__(self, snapshot, spans):
+        self._snapshot = snapshot
+        self._spans = spans   # letter -> (start, count)
+
+    def __getitem__(self, letter):
+        start, count = self._spans[letter]
+        return self._snapshot.word_list(start, count)
+
+    def get(self, letter, default=None):
+        span = self._spans.get(letter)
+        return default if span is None else self._snapshot.word_list(*span)
+
+    def __contains__(self, letter):
+        return letter in self._spans
+
+    def __iter__(self):
+        return iter(self._spans)
+
+    def __len__(self):
+        return len(self._spans)
+
+
+class MappedSnapshot:
+    def __init__(self, path=SNAPSHOT_PATH):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, n_strings, n_records, n_ids,
+         records_pos, ids_pos, offsets_pos, blob_pos) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{self.path} is not a v{VERSION} trick snapshot")
+
+        view = memoryview(self._mmap)
+        self._ids = self._u32(view[ids_pos:ids_pos + n_ids * 4])
+        self._offsets = self._u32(view[offsets_pos:offsets_pos + (n_strings + 1) * 4])
+        self._blob = view[blob_pos:]
+
+        # Only the small record table is materialized: section -> category -> letter -> span
+        self.sections = {}
+        for i in range(n_records):
+            section, category, letter, start, count = RECORD.unpack_from(self._mmap, records_pos + i * RECORD.size)
+            self.sections.setdefault(section, {}).setdefault(self.string(category), {})[self.string(letter)] = (start, count)
+
+        self.word_list = lru_cache(maxsize=SNAPSHOT_DECODE_CACHE)(self._word_list)
+
+    @staticmethod
+    def _u32(view):
+        if sys.byteorder == "little":
+            return view.cast("I")
+        values = array("I", view.tobytes())
+        values.byteswap()
+        return values
+
+    def string(self, sid):
+        return str(self._blob[self._offsets[sid]:self._offsets[sid + 1]], "utf-8")
+
+    def _word_list(self, start, count):
+        return tuple(self.string(sid) for sid in self._ids[start:start + count])
+
+    def banks(self, section):
+        return {category: MappedLetters(self, spans) for category, spans in self.sections.get(section, {}).items()}
+
+    def lists(self, section):
+        """Sections keyed by category only (letter "")."""
+        return {category: self.word_list(*spans[""]) for category, spans in self.sections.get(section, {}).items()}
+
+    def entries(self):
+        return [json.loads(text) for text in self.lists(ENTRIES).get("", ())]
+
+
+def main(argv=None):
+    import data_registry
+
+    target = Path(argv[0]) if argv else data_registry.SNAPSHOT_FILE
+    snapshot = data_registry.build_snapshot(use_binary=False)
+    banks = {"nouns": snapshot.nouns, "prepositions": snapshot.prepositions}
+    path = write_snapshot(target, banks, snapshot.wordbank_index,
+                          snapshot.templates_by_length, snapshot.abbreviation_entries,
+                          snapshot.nickname_templates)
+    print(f"Wrote {path} ({path.stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
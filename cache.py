@@ -1,41 +1,181 @@
 import json
+import logging
 import os
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
-CACHE_PATH = Path("data/abbreviations.json")
+import metrics
 
-def load_cache():
-    print(f"[DEBUG] Current working directory: {os.getcwd()}")
-    print(f"[DEBUG] Absolute path to cache file: {CACHE_PATH.resolve()}")
-    print(f"[DEBUG] Loading cache from: {CACHE_PATH}")
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = Path("data/abbreviations.json")   # compacted snapshot (same format as before)
+LOG_PATH = CACHE_PATH.with_suffix(".log")       # append-only JSON lines since last compaction
+LOCK_PATH = CACHE_PATH.with_suffix(".lock")
+
+# Fold the log into the snapshot once it holds this many entries
+COMPACT_THRESHOLD = int(os.getenv("CACHE_COMPACT_THRESHOLD", "1000"))
+
+
+class AbbreviationStore:
+    """
+    In-memory dict backed by a JSON snapshot plus an append-only log.
+
+    Writers take an exclusive flock on LOCK_PATH, so several uvicorn workers
+    can share the files; each process replays only the log lines it has not
+    seen yet before reading or writing.
+    """
 
-    if CACHE_PATH.exists():
-        with open(CACHE_PATH, "r", encoding="utf-8") as f:
+    def __init__(self, snapshot_path=CACHE_PATH, log_path=LOG_PATH, lock_path=LOCK_PATH,
+                 compact_threshold=COMPACT_THRESHOLD):
+        self.snapshot_path = Path(snapshot_path)
+        self.log_path = Path(log_path)
+        self.lock_path = Path(lock_path)
+        self.compact_threshold = compact_threshold
+        self._data = {}
+        self._snapshot_id = None
+        self._log_offset = 0
+        self._log_entries = 0
+        self._mutex = threading.RLock()
+
+    @contextmanager
+    def _locked(self, exclusive):
+        with self._mutex:
+            if fcntl is None:
+                yield
+                return
+            self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_path, "a+") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _file_id(path):
+        try:
+            st = path.stat()
+            return st.st_ino, st.st_mtime_ns, st.st_size
+        except FileNotFoundError:
+            return None
+
+    def _load_snapshot(self):
+        self._data = {}
+        self._log_offset = 0
+        self._log_entries = 0
+        self._snapshot_id = self._file_id(self.snapshot_path)
+        if self._snapshot_id is None:
+            return
+        with open(self.snapshot_path, "r", encoding="utf-8") as f:
             try:
-                data = json.load(f)
-                print(f"[DEBUG] Loaded {len(data)} entries from cache.")
-                return data
+                self._data = json.load(f)
             except json.JSONDecodeError:
-                print("[ERROR] JSON decode error — file is empty or malformed. Returning empty dict.")
-                return {}
-    print("[DEBUG] Cache file not found. Returning empty dict.")
-    return {}
+                logger.error("Cache snapshot %s is empty or malformed, starting empty", self.snapshot_path)
+
+    def _replay_log(self):
+        try:
+            size = self.log_path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size < self._log_offset:
+            # Log was truncated by another process's compaction
+            self._load_snapshot()
+        if size == self._log_offset:
+            return
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partial line from a writer that is still appending
+                self._log_offset += len(line)
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.error("Skipping corrupt cache log line at offset %d", self._log_offset)
+                    continue
+                self._data[entry["abbr"].lower()] = entry
+                self._log_entries += 1
+
+    def _refresh(self):
+        if self._file_id(self.snapshot_path) != self._snapshot_id:
+            self._load_snapshot()
+        self._replay_log()
+
+    def refresh(self):
+        with metrics.timed("cache", "refresh"), self._locked(exclusive=False):
+            self._refresh()
+
+    def all(self):
+        self.refresh()
+        return dict(self._data)
+
+    def get(self, abbr):
+        self.refresh()
+        entry = self._data.get(abbr.lower())
+        metrics.CACHE_EVENTS.inc(cache="abbreviations", result="hit" if entry is not None else "miss")
+        return entry
+
+    def save_many(self, entries):
+        """Append every entry whose abbr is not cached yet. Returns the number written."""
+        with metrics.timed("cache", "save_many"), self._locked(exclusive=True):
+            self._refresh()
+            new_entries = {}
+            for entry in entries:
+                key = entry["abbr"].lower()
+                if key not in self._data and key not in new_entries:
+                    new_entries[key] = entry
+            if not new_entries:
+                return 0
+
+            payload = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in new_entries.values())
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_path, "ab") as f:
+                f.write(payload.encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+            # Our own lines are picked up by the replay, which also advances the offset
+            self._replay_log()
+            logger.debug("Appended %d cache entries", len(new_entries))
+
+            if self._log_entries >= self.compact_threshold:
+                self._compact()
+            return len(new_entries)
+
+    def compact(self):
+        with metrics.timed("cache", "compact"), self._locked(exclusive=True):
+            self._refresh()
+            self._compact()
+
+    def _compact(self):
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.snapshot_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        open(self.log_path, "w").close()
+        self._snapshot_id = self._file_id(self.snapshot_path)
+        self._log_offset = 0
+        self._log_entries = 0
+        logger.info("Compacted cache to %d entries in %s", len(self._data), self.snapshot_path)
+
+
+store = AbbreviationStore()
+
+
+def load_cache():
+    return store.all()
 
 def save_to_cache(new_entry):
-    print(f"[DEBUG] Trying to save: {new_entry}")
-    cache = load_cache()
-    key = new_entry['abbr'].lower()
-
-    if key in cache:
-        print(f"[DEBUG] Entry '{new_entry['abbr']}' already exists in cache. Skipping save.")
-        return
-
-    cache[key] = new_entry
-    
-    # Ensure parent directory exists
-    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
-
-    with open(CACHE_PATH, "w", encoding="utf-8") as f:
-        json.dump(cache, f, indent=2, ensure_ascii=False)
-        print(f"[DEBUG] Saved new entry for '{new_entry['abbr']}' to cache.")
-        print(f"[DEBUG] Written to: {CACHE_PATH.resolve()}")
+    if not store.save_many([new_entry]):
+        logger.debug("Entry '%s' already exists in cache. Skipping save.", new_entry['abbr'])
+
+def save_many(entries):
+    return store.save_many(entries)
@@ -1,2 +1,133 @@
+import os
+
 DATA_PATH = "data/"
 IMAGE_PATH = "static/images/"
+
+# Compiled binary snapshot of data.json/wordbank.json/templates (see binary_snapshot.py).
+# Used instead of the JSON when it is at least as new as every source file.
+USE_BINARY_SNAPSHOT = os.getenv("USE_BINARY_SNAPSHOT", "1") == "1"
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "data/snapshot.bin")
+# Decoded word lists kept per process on top of the shared mmap pages
+SNAPSHOT_DECODE_CACHE = int(os.getenv("SNAPSHOT_DECODE_CACHE", "4096"))
+
+# Precomputed mnemonics for short acronyms (see acronym_table.py); used while
+# it is at least as new as data.json, longer inputs are generated live
+USE_ACRONYM_TABLE = os.getenv("USE_ACRONYM_TABLE", "1") == "1"
+ACRONYM_TABLE_PATH = os.getenv("ACRONYM_TABLE_PATH", "data/acronyms.bin")
+ACRONYM_TABLE_MAX_LEN = int(os.getenv("ACRONYM_TABLE_MAX_LEN", "4"))
+ACRONYM_TABLE_VARIANTS = int(os.getenv("ACRONYM_TABLE_VARIANTS", "8"))
+
+# Multi-worker mode: reloads in one worker are broadcast to the others through
+# a shared generation counter file (see worker_sync.py)
+WORKER_SYNC = os.getenv("WORKER_SYNC", "0") == "1"
+GENERATION_PATH = os.getenv("GENERATION_PATH", "data/registry.generation")
+
+# When the data is loaded: "eager" (before the server accepts connections),
+# "background" (warm-up thread right after startup) or "lazy" (first request)
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "eager")
+
+# Poll interval (seconds) for hot-reloading wordbank/data/templates; 0 disables the watcher
+DATA_WATCH_INTERVAL = float(os.getenv("DATA_WATCH_INTERVAL", "0"))
+
+# POST /api/tricks/batch limits; inputs are sampled and streamed back in chunks
+BATCH_MAX_INPUTS = int(os.getenv("BATCH_MAX_INPUTS", "5000"))
+BATCH_MAX_VARIANTS = int(os.getenv("BATCH_MAX_VARIANTS", "50"))
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "200"))
+
+# GET /api/tricks/nickname/stream page size (NDJSON lines per request)
+NICKNAME_PAGE_DEFAULT = int(os.getenv("NICKNAME_PAGE_DEFAULT", "100"))
+NICKNAME_PAGE_MAX = int(os.getenv("NICKNAME_PAGE_MAX", "10000"))
+
+# GET /api/tricks?top_k=N: largest N, and how many candidates are scored per request
+RANK_MAX_TOP_K = int(os.getenv("RANK_MAX_TOP_K", "50"))
+RANK_CANDIDATE_BUDGET = int(os.getenv("RANK_CANDIDATE_BUDGET", "5000"))
+
+# ingest.py: records per abbreviation-log write and per POST /admin/ingest call
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "1000"))
+
+# /admin/* requires this value in the X-Admin-Token header; unset, /admin/* only
+# answers loopback clients (set a token when running behind a reverse proxy)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# /search/ pagination
+SEARCH_DEFAULT_LIMIT = int(os.getenv("SEARCH_DEFAULT_LIMIT", "50"))
+SEARCH_MAX_LIMIT = int(os.getenv("SEARCH_MAX_LIMIT", "500"))
+
+# External definition sources (URLs overridable so a local stub server can stand in)
+DUCKDUCKGO_URL = os.getenv("DUCKDUCKGO_URL", "https://api.duckduckgo.com/")
+ABBREVIATIONS_COM_URL = os.getenv("ABBREVIATIONS_COM_URL", "https://www.abbreviations.com/serp.php")
+EXTERNAL_TIMEOUT = float(os.getenv("EXTERNAL_TIMEOUT", "5"))
+EXTERNAL_RETRIES = int(os.getenv("EXTERNAL_RETRIES", "2"))
+EXTERNAL_MAX_CONNECTIONS = int(os.getenv("EXTERNAL_MAX_CONNECTIONS", "50"))
+EXTERNAL_MAX_PER_HOST = int(os.getenv("EXTERNAL_MAX_PER_HOST", "10"))
+EXTERNAL_BREAKER_FAILURES = int(os.getenv("EXTERNAL_BREAKER_FAILURES", "5"))
+EXTERNAL_BREAKER_COOLDOWN = float(os.getenv("EXTERNAL_BREAKER_COOLDOWN", "30"))
+
+# Persistent lookup cache in front of the external sources (see lookup_cache.py):
+# answers live EXTERNAL_CACHE_TTL seconds, "not found" EXTERNAL_CACHE_NEGATIVE_TTL;
+# expired entries are served for EXTERNAL_CACHE_STALE more seconds while refreshed
+EXTERNAL_CACHE_ENABLED = os.getenv("EXTERNAL_CACHE_ENABLED", "1") == "1"
+EXTERNAL_CACHE_PATH = os.getenv("EXTERNAL_CACHE_PATH", "data/external_lookups.sqlite3")
+EXTERNAL_CACHE_MAX_ENTRIES = int(os.getenv("EXTERNAL_CACHE_MAX_ENTRIES", "100000"))
+EXTERNAL_CACHE_TTL = float(os.getenv("EXTERNAL_CACHE_TTL", "86400"))
+EXTERNAL_CACHE_NEGATIVE_TTL = float(os.getenv("EXTERNAL_CACHE_NEGATIVE_TTL", "3600"))
+EXTERNAL_CACHE_STALE = float(os.getenv("EXTERNAL_CACHE_STALE", "604800"))
+
+# Worker threads shared by the /wiki and /fetch-abbreviations/ per-term lookups
+FANOUT_WORKERS = int(os.getenv("FANOUT_WORKERS", "16"))
+# Threads Starlette may use at once for sync (def) routes and streaming generators
+SYNC_ROUTE_THREADS = int(os.getenv("SYNC_ROUTE_THREADS", "40"))
+
+# Admission control (see admission.py). Concurrent requests per route pool as
+# "path=limit" pairs; the longest matching path wins and "path?type=name" targets
+# one trick type. Keep the expensive pools' total under SYNC_ROUTE_THREADS so cheap
+# routes always find a thread. Up to ADMISSION_QUEUE requests per pool wait at most
+# ADMISSION_WAIT seconds, otherwise (or when the wait is predicted to exceed that)
+# they get a 503 with Retry-After at once.
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "1") == "1"
+ADMISSION_LIMITS = os.getenv(
+    "ADMISSION_LIMITS",
+    "/wiki=4,/fetch-abbreviations/=4,/api/tricks/batch=2,/api/tricks/nickname/stream=4,"
+    "/api/tricks?type=generate_sentence=8,/api/tricks?type=nickname=8,/api/tricks=64,/search/=64",
+)
+ADMISSION_QUEUE = int(os.getenv("ADMISSION_QUEUE", "32"))
+ADMISSION_WAIT = float(os.getenv("ADMISSION_WAIT", "2"))
+# Per-client token bucket: requests per second and burst size; 0 disables. Clients
+# are keyed by the peer address, so behind a reverse proxy either run uvicorn with
+# --forwarded-allow-ips=<proxy ip> (it then rewrites the peer from X-Forwarded-For)
+# or list the proxies in ADMISSION_TRUSTED_PROXIES; otherwise every user shares
+# the proxy's bucket.
+ADMISSION_RATE = float(os.getenv("ADMISSION_RATE", "20"))
+ADMISSION_BURST = int(os.getenv("ADMISSION_BURST", "40"))
+ADMISSION_MAX_CLIENTS = int(os.getenv("ADMISSION_MAX_CLIENTS", "10000"))
+# Comma-separated peer addresses whose X-Forwarded-For is believed for the bucket key
+ADMISSION_TRUSTED_PROXIES = os.getenv("ADMISSION_TRUSTED_PROXIES", "")
+
+# Event-loop lag monitor: probe every LOOP_LAG_INTERVAL seconds (0 disables); a stall
+# longer than LOOP_LAG_THRESHOLD is logged with the stack of the code blocking the loop
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))
+LOOP_LAG_THRESHOLD = float(os.getenv("LOOP_LAG_THRESHOLD", "0.25"))
+
+# Max edit distance for near-miss abbreviation lookups; 0 turns the fuzzy fallback off
+FUZZY_MAX_DISTANCE = int(os.getenv("FUZZY_MAX_DISTANCE", "1"))
+
+# In-process response cache in front of GET /api/tricks
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "10000"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+# Seed unseeded tricks from their normalized input, so a cache miss recomputes the same answer
+DETERMINISTIC_TRICKS = os.getenv("DETERMINISTIC_TRICKS", "0") == "1"
+
+# wiki_utils lookup cache; misses ("Not found") expire sooner than hits
+WIKI_CACHE_SIZE = int(os.getenv("WIKI_CACHE_SIZE", "10000"))
+WIKI_CACHE_TTL = float(os.getenv("WIKI_CACHE_TTL", "3600"))
+WIKI_NEGATIVE_TTL = float(os.getenv("WIKI_NEGATIVE_TTL", "60"))
+
+# Logging: root level, per-module overrides ("cache=DEBUG,routes.tricks=WARNING"),
+# "text" or "json" lines, and the share of hot-path debug/info events that are kept
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))
+
+# Prometheus-style /metrics; with 0 every timer/counter is a no-op
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
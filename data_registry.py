@@ -0,0 +1,379 @@
+import dataclasses
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+
+import binary_snapshot
+import metrics
+from acronym_table import AcronymTable
+from abbreviation_index import AbbreviationIndex
+from routes.generate_template_sentence import TemplateIndex, build_template_index
+from nicknames import NicknameGenerator
+from sentence_solver import SentenceSolver
+from config import (
+    ACRONYM_TABLE_PATH,
+    GENERATION_PATH,
+    SNAPSHOT_PATH,
+    USE_ACRONYM_TABLE,
+    USE_BINARY_SNAPSHOT,
+    WORKER_SYNC,
+)
+from wordbank_index import WordbankIndex
+from worker_sync import GenerationCounter
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# Source files for the preloaded snapshot
+DATA_FILES = {
+    "abbreviations": BASE_DIR / "data.json",
+    "wordbank": BASE_DIR / "wordbank.json",
+    "templates": BASE_DIR / "routes" / "English_templates.json",
+    "nicknames": BASE_DIR / "nickname_templates.json",
+}
+
+# Compiled form of DATA_FILES, preferred while it is not older than any of them
+SNAPSHOT_FILE = BASE_DIR / SNAPSHOT_PATH
+# Precomputed short-acronym mnemonics, derived from data.json
+ACRONYM_TABLE_FILE = BASE_DIR / ACRONYM_TABLE_PATH
+
+EMPTY = MappingProxyType({})
+
+
+@dataclass(frozen=True)
+class DataSnapshot:
+    """Read-only view of all request-path data, built once and swapped atomically."""
+    nouns: MappingProxyType
+    prepositions: MappingProxyType
+    abbreviation_entries: tuple
+    abbreviation_index: AbbreviationIndex
+    wordbank: MappingProxyType
+    wordbank_index: WordbankIndex
+    templates_by_length: MappingProxyType
+    templates: tuple
+    template_index: TemplateIndex
+    sentence_solver: SentenceSolver
+    nickname_templates: tuple
+    nickname_generator: NicknameGenerator
+    acronym_table: object   # AcronymTable or None
+    mtimes: MappingProxyType
+    loaded_at: float = field(default_factory=time.time)
+    generation: int = 0   # worker_sync counter value this snapshot was loaded for
+
+
+_snapshot = None
+_lock = threading.Lock()
+_first_load = threading.Lock()
+_listeners = []
+_counter = None
+
+
+def _read_json(name, default):
+    path = DATA_FILES[name]
+    if not path.exists():
+        logger.warning("[%s] File not found: %s", name.upper(), path)
+        return default
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _mtime(path):
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+DEFAULT_LETTER = "_DEFAULT"   # data.json's "_default" key, uppercased like every letter key
+
+
+def bank_words(bank, letter):
+    """
+    Words for `letter` in a noun/preposition bank, else the bank's _DEFAULT
+    words (empty when it has neither). The one fallback rule shared by live
+    generation, ranking/batches and the precomputed acronym table.
+    """
+    return bank.get(letter) or bank.get(DEFAULT_LETTER) or ()
+
+
+def normalize_letter_banks(raw_data):
+    """Category keys -> lowercase, letter keys -> uppercase, word lists -> tuples."""
+    normalized = {}
+    for key, value in raw_data.items():
+        if isinstance(value, dict):
+            normalized[key.lower()] = MappingProxyType(
+                {k.upper(): tuple(v) for k, v in value.items()}
+            )
+        else:
+            normalized[key.lower()] = value
+    return MappingProxyType(normalized)
+
+
+def _watched():
+    return {**DATA_FILES, "snapshot": SNAPSHOT_FILE, "acronyms": ACRONYM_TABLE_FILE}
+
+
+def binary_is_fresh(mtimes):
+    built = mtimes.get("snapshot")
+    if built is None:
+        return False
+    return all(mtime is None or mtime <= built for name, mtime in mtimes.items() if name in DATA_FILES)
+
+
+def _load_acronym_table(mtimes):
+    built = mtimes.get("acronyms")
+    if not USE_ACRONYM_TABLE or built is None:
+        return None
+    source = mtimes.get("abbreviations")
+    if source is not None and source > built:
+        logger.warning("[REGISTRY] %s is older than data.json, generating live (rebuild with acronym_table.py)", ACRONYM_TABLE_FILE)
+        return None
+    try:
+        return AcronymTable(ACRONYM_TABLE_FILE)
+    except (OSError, ValueError):
+        logger.exception("[REGISTRY] Unreadable acronym table %s, generating live", ACRONYM_TABLE_FILE)
+        return None
+
+
+def _build_from_binary(mapped, mtimes):
+    banks = mapped.banks(binary_snapshot.BANKS)
+    entries = tuple(MappingProxyType(item) for item in mapped.entries())
+    wordbank = MappingProxyType(mapped.banks(binary_snapshot.WORDS))
+    wordbank_index = WordbankIndex.from_tables(
+        wordbank, mapped.banks(binary_snapshot.PLURALS), mapped.lists(binary_snapshot.FALLBACK_PLURALS)
+    )
+    templates_by_length = MappingProxyType(mapped.lists(binary_snapshot.TEMPLATES))
+    templates = tuple(t for group in templates_by_length.values() for t in group)
+    template_index = build_template_index(templates)
+    nickname_templates = tuple(t for group in mapped.lists(binary_snapshot.NICKNAMES).values() for t in group)
+
+    return DataSnapshot(
+        nouns=banks.get("nouns", EMPTY),
+        prepositions=banks.get("prepositions", EMPTY),
+        abbreviation_entries=entries,
+        abbreviation_index=AbbreviationIndex(entries),
+        wordbank=wordbank,
+        wordbank_index=wordbank_index,
+        templates_by_length=templates_by_length,
+        templates=templates,
+        template_index=template_index,
+        sentence_solver=SentenceSolver(template_index, wordbank_index),
+        nickname_templates=nickname_templates,
+        nickname_generator=NicknameGenerator(build_template_index(nickname_templates), wordbank_index),
+        acronym_table=_load_acronym_table(mtimes),
+        mtimes=MappingProxyType(mtimes),
+    )
+
+
+def build_snapshot(use_binary=USE_BINARY_SNAPSHOT):
+    mtimes = {name: _mtime(path) for name, path in _watched().items()}
+
+    if use_binary and binary_is_fresh(mtimes):
+        try:
+            return _build_from_binary(binary_snapshot.MappedSnapshot(SNAPSHOT_FILE), mtimes)
+        except (OSError, ValueError):
+            logger.exception("[REGISTRY] Unreadable binary snapshot %s, falling back to JSON", SNAPSHOT_FILE)
+    elif use_binary and mtimes["snapshot"] is not None:
+        logger.warning("[REGISTRY] %s is older than its sources, loading JSON (rebuild with binary_snapshot.py)", SNAPSHOT_FILE)
+
+    raw_abbr = _read_json("abbreviations", {})
+    if isinstance(raw_abbr, dict):
+        banks = normalize_letter_banks(raw_abbr)
+        entries = ()
+    else:
+        # data.json in the list-of-entries shape ({"abbr", "full_form", "description"})
+        banks = EMPTY
+        entries = tuple(MappingProxyType(dict(item)) for item in raw_abbr if isinstance(item, dict))
+
+    raw_wordbank = _read_json("wordbank", {})
+    wordbank = normalize_letter_banks(raw_wordbank)
+
+    wordbank_index = WordbankIndex(raw_wordbank)
+
+    raw_templates = _read_json("templates", {}).get("TEMPLATES_BY_LENGTH", {})
+    templates_by_length = MappingProxyType({k: tuple(v) for k, v in raw_templates.items()})
+    templates = tuple(t for group in templates_by_length.values() for t in group)
+    template_index = build_template_index(templates)
+
+    raw_nicknames = _read_json("nicknames", {}).get("TEMPLATES_BY_LENGTH", {})
+    nickname_templates = tuple(t for group in raw_nicknames.values() for t in group)
+
+    return DataSnapshot(
+        nouns=banks.get("nouns", EMPTY),
+        prepositions=banks.get("prepositions", EMPTY),
+        abbreviation_entries=entries,
+        abbreviation_index=AbbreviationIndex(entries),
+        wordbank=wordbank,
+        wordbank_index=wordbank_index,
+        templates_by_length=templates_by_length,
+        templates=templates,
+        template_index=template_index,
+        sentence_solver=SentenceSolver(template_index, wordbank_index),
+        nickname_templates=nickname_templates,
+        nickname_generator=NicknameGenerator(build_template_index(nickname_templates), wordbank_index),
+        acronym_table=_load_acronym_table(mtimes),
+        mtimes=MappingProxyType(mtimes),
+    )
+
+
+def generation_counter():
+    """Shared GenerationCounter when WORKER_SYNC is on, else None."""
+    global _counter
+    if WORKER_SYNC and _counter is None:
+        _counter = GenerationCounter(BASE_DIR / GENERATION_PATH)
+    return _counter
+
+
+def shared_generation():
+    """The generation the workers should be on (an mmap read, safe on the event loop); 0 without WORKER_SYNC."""
+    counter = generation_counter()
+    return counter.value() if counter else 0
+
+
+def _publish(snapshot):
+    global _snapshot
+    with _lock:
+        _snapshot = snapshot
+    for listener in list(_listeners):
+        listener(snapshot)
+
+
+def load():
+    """Build a fresh snapshot and publish it. Readers never see a half-built one."""
+    counter = generation_counter()
+    # Read before building: a bump that lands mid-build makes this snapshot stale again
+    generation = counter.value() if counter else 0
+    with metrics.timed("registry", "load"):
+        snapshot = dataclasses.replace(build_snapshot(), generation=generation)
+    _publish(snapshot)
+    logger.info(
+        "[REGISTRY] Loaded %d wordbank categories, %d templates",
+        len(snapshot.wordbank), len(snapshot.templates),
+    )
+    return snapshot
+
+
+def get():
+    """Return the current snapshot, loading it on first use (e.g. outside the app lifespan)."""
+    snapshot = _snapshot
+    if snapshot is None:
+        # A warm-up thread and early requests may race here; only one of them parses
+        with _first_load:
+            snapshot = _snapshot or load()
+        return snapshot
+
+    counter = generation_counter()
+    if counter and counter.value() != snapshot.generation:
+        # Another worker reloaded. One thread follows; the rest keep serving the old snapshot meanwhile
+        if _first_load.acquire(blocking=False):
+            try:
+                if counter.value() != _snapshot.generation:
+                    snapshot = load()
+            finally:
+                _first_load.release()
+    return snapshot
+
+
+def reload():
+    """Reload here and, with WORKER_SYNC, tell every other worker to follow."""
+    counter = generation_counter()
+    if counter:
+        counter.bump()
+    return load()
+
+
+def _extend_bank(bank, additions):
+    merged = dict(bank)
+    for letter, words in additions.items():
+        merged[letter] = merged.get(letter, ()) + tuple(words)
+    return MappingProxyType(merged)
+
+
+def extend_words(target, additions):
+    """
+    Apply ingested words ({category: {LETTER: [words]}}) to the live snapshot
+    without re-reading any file: "wordbank" rebuilds only the wordbank-derived
+    indexes (pluralizing just the new words), "data" extends nouns/prepositions.
+    The source files are expected to already contain the words (see ingest.py).
+    """
+    with _first_load, metrics.timed("registry", "extend"):
+        old = _snapshot or load()
+        if target == "wordbank":
+            index = old.wordbank_index.with_words(additions)
+            changes = {
+                "wordbank": MappingProxyType({**old.wordbank, **{c: index.categories[c] for c in additions}}),
+                "wordbank_index": index,
+                "sentence_solver": SentenceSolver(old.template_index, index),
+                "nickname_generator": NicknameGenerator(old.nickname_generator.templates, index),
+            }
+        elif target == "data":
+            changes = {
+                "nouns": _extend_bank(old.nouns, additions.get("nouns", {})),
+                "prepositions": _extend_bank(old.prepositions, additions.get("prepositions", {})),
+                "acronym_table": None,  # precomputed from the old banks
+            }
+        else:
+            raise ValueError(f"Unknown word target {target!r}")
+
+        # Other workers pick the merged files up with a full reload
+        counter = generation_counter()
+        generation = counter.bump() if counter else old.generation
+        mtimes = {name: _mtime(path) for name, path in _watched().items()}
+        snapshot = dataclasses.replace(
+            old, mtimes=MappingProxyType(mtimes), generation=generation, loaded_at=time.time(), **changes
+        )
+        _publish(snapshot)
+    logger.info("[REGISTRY] Extended %s with %d categories in place", target, len(additions))
+    return snapshot
+
+
+def subscribe(listener):
+    """Call `listener(snapshot)` after every (re)load, e.g. to drop derived caches."""
+    _listeners.append(listener)
+
+
+def has_changed(snapshot=None):
+    snapshot = snapshot or _snapshot
+    if snapshot is None:
+        return True
+    return any(_mtime(path) != snapshot.mtimes.get(name) for name, path in _watched().items())
+
+
+def reload_if_changed():
+    if has_changed():
+        return load()
+    return None
+
+
+class FileWatcher:
+    """Background thread that polls source mtimes and hot-reloads on change."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="data-registry-watcher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=self.interval + 1)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                reload_if_changed()
+            except Exception:
+                # Keep serving the previous snapshot if the new files are broken
+                logger.exception("[REGISTRY] Reload failed, keeping previous snapshot")
+
+
+def start_watcher(interval):
+    return FileWatcher(interval).start()
@@ -1,30 +1,174 @@
-import requests
+"""
+Definition lookups from DuckDuckGo and Abbreviations.com, sync (requests) and
+async (pooled httpx with breakers), behind the persistent lookup cache:
 
-def fetch_from_duckduckgo(term: str):
+    python external_sources.py terms.txt     # prewarm the cache, one term per line
+"""
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+import fanout
+import metrics
+from config import (
+    ABBREVIATIONS_COM_URL,
+    DUCKDUCKGO_URL,
+    EXTERNAL_BREAKER_COOLDOWN,
+    EXTERNAL_BREAKER_FAILURES,
+    EXTERNAL_CACHE_ENABLED,
+    EXTERNAL_CACHE_MAX_ENTRIES,
+    EXTERNAL_CACHE_NEGATIVE_TTL,
+    EXTERNAL_CACHE_PATH,
+    EXTERNAL_CACHE_STALE,
+    EXTERNAL_CACHE_TTL,
+    EXTERNAL_MAX_CONNECTIONS,
+    EXTERNAL_MAX_PER_HOST,
+    EXTERNAL_RETRIES,
+    EXTERNAL_TIMEOUT,
+)
+from lookup_cache import FRESH, MISS, STALE, LookupCache
+
+logger = logging.getLogger(__name__)
+
+_session = None
+
+
+def _get_session():
+    """Shared keep-alive session for the sync helpers, created (and requests imported) on first use."""
+    global _session
+    if _session is None:
+        import requests
+        _session = requests.Session()
+    return _session
+
+
+def _host(url):
+    return urlsplit(url).netloc
+
+
+def _parse_duckduckgo(data: dict, term: str):
+    abstract = data.get("AbstractText", "")
+    heading = data.get("Heading", "")
+
+    if abstract:
+        return {
+            "abbr": term,
+            "full_form": heading or term,
+            "description": abstract
+        }
+    return None
+
+
+def _parse_abbreviations_com(text: str, term: str):
+    if "meaning" in text.lower():
+        # Naive string matching (optional: use BeautifulSoup if structure is fixed)
+        for line in text.splitlines():
+            if '<p class="desc">' in line:
+                desc = line.strip().replace('<p class="desc">', '').replace('</p>', '')
+                return {
+                    "abbr": term,
+                    "full_form": term,
+                    "description": desc
+                }
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Persistent lookup cache (stale-while-revalidate)
+# ---------------------------------------------------------------------------
+
+lookups = LookupCache(
+    EXTERNAL_CACHE_PATH, EXTERNAL_CACHE_MAX_ENTRIES,
+    EXTERNAL_CACHE_TTL, EXTERNAL_CACHE_NEGATIVE_TTL, EXTERNAL_CACHE_STALE,
+)
+metrics.register_cache("external_lookups", lookups)
+
+_refreshing = set()       # (source, key) with a background refresh queued or running
+_refreshing_lock = threading.Lock()
+_background = set()       # async refresh tasks, referenced until they finish
+
+
+def _claim_refresh(source, term):
+    key = (source, lookups.key(term))
+    with _refreshing_lock:
+        if key in _refreshing:
+            return None
+        _refreshing.add(key)
+    return key
+
+
+def _cached(source, term, fetch):
     """
-    Try to fetch a definition from DuckDuckGo's Instant Answer API.
+    `fetch(term)` raises on failure and returns None for "not found"; both
+    outcomes it returns are cached, failures are not. Stale entries are
+    returned as-is and refreshed in the fanout pool.
     """
+    if not EXTERNAL_CACHE_ENABLED:
+        return fetch(term)
+    state, value = lookups.get(source, term)
+    if state == STALE:
+        key = _claim_refresh(source, term)
+        if key is not None:
+            fanout.executor.submit(_refresh, key, source, term, fetch)
+    if state != MISS:
+        return value
+    value = fetch(term)
+    lookups.put(source, term, value)
+    return value
+
+
+def _refresh(key, source, term, fetch):
+    try:
+        lookups.put(source, term, fetch(term))
+    except Exception as e:
+        logger.warning("[%s refresh ERROR] %s: %s", source, term, e)  # keep serving the stale entry
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+
+def _duckduckgo(term):
     try:
-        response = requests.get(
-            "https://api.duckduckgo.com/",
-            params={"q": term, "format": "json", "no_redirect": "1", "no_html": "1"},
-            timeout=5
-        )
-        data = response.json()
+        with metrics.EXTERNAL_LATENCY.time(host=_host(DUCKDUCKGO_URL)):
+            response = _get_session().get(
+                DUCKDUCKGO_URL,
+                params={"q": term, "format": "json", "no_redirect": "1", "no_html": "1"},
+                timeout=EXTERNAL_TIMEOUT
+            )
+        return _parse_duckduckgo(response.json(), term)
+    except Exception:
+        metrics.EXTERNAL_ERRORS.inc(host=_host(DUCKDUCKGO_URL))
+        raise
 
-        abstract = data.get("AbstractText", "")
-        heading = data.get("Heading", "")
 
-        if abstract:
-            return {
-                "abbr": term,
-                "full_form": heading or term,
-                "description": abstract
-            }
+def _abbreviations_com(term):
+    try:
+        with metrics.EXTERNAL_LATENCY.time(host=_host(ABBREVIATIONS_COM_URL)):
+            response = _get_session().get(
+                ABBREVIATIONS_COM_URL,
+                params={"st": term, "qtype": "1"},
+                timeout=EXTERNAL_TIMEOUT
+            )
+        return _parse_abbreviations_com(response.text, term)
+    except Exception:
+        metrics.EXTERNAL_ERRORS.inc(host=_host(ABBREVIATIONS_COM_URL))
+        raise
 
-        return None
+
+def fetch_from_duckduckgo(term: str):
+    """
+    Try to fetch a definition from DuckDuckGo's Instant Answer API.
+    """
+    try:
+        return _cached("duckduckgo", term, _duckduckgo)
     except Exception as e:
-        print(f"[DuckDuckGo ERROR] {e}")
+        logger.warning("[DuckDuckGo ERROR] %s", e)
         return None
 
 
@@ -34,20 +178,269 @@ def fetch_from_abbreviations_com(term: str):
     This may break if they change their layout.
     """
     try:
-        url = f"https://www.abbreviations.com/serp.php?st={term}&qtype=1"
-        response = requests.get(url, timeout=5)
-        if "meaning" in response.text.lower():
-            # Naive string matching (optional: use BeautifulSoup if structure is fixed)
-            lines = response.text.splitlines()
-            for line in lines:
-                if '<p class="desc">' in line:
-                    desc = line.strip().replace('<p class="desc">', '').replace('</p>', '')
-                    return {
-                        "abbr": term,
-                        "full_form": term,
-                        "description": desc
-                    }
+        return _cached("abbreviations_com", term, _abbreviations_com)
+    except Exception as e:
+        logger.warning("[Abbreviations.com ERROR] %s", e)
         return None
+
+
+# ---------------------------------------------------------------------------
+# Async client layer
+# ---------------------------------------------------------------------------
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Opens after `max_failures` consecutive failures and rejects calls for
+    `cooldown` seconds; after that one trial call is let through (half-open).
+    """
+
+    def __init__(self, max_failures=EXTERNAL_BREAKER_FAILURES, cooldown=EXTERNAL_BREAKER_COOLDOWN):
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        state = self.state
+        if state == "open":
+            raise CircuitOpenError("circuit open")
+        if state == "half-open":
+            # Re-arm so only this trial call goes through until it reports back
+            self.opened_at = time.monotonic()
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.max_failures:
+            self.opened_at = time.monotonic()
+
+
+class AsyncLookupClient:
+    """Pooled httpx client with per-host concurrency limits, retries and a breaker per host."""
+
+    def __init__(self, timeout=EXTERNAL_TIMEOUT, max_connections=EXTERNAL_MAX_CONNECTIONS,
+                 max_per_host=EXTERNAL_MAX_PER_HOST, retries=EXTERNAL_RETRIES):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.retries = retries
+        self.breakers = {}
+        self._semaphores = {}
+        self._client = None
+
+    def _http(self):
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                follow_redirects=True,
+            )
+        return self._client
+
+    def breaker(self, host):
+        if host not in self.breakers:
+            self.breakers[host] = CircuitBreaker()
+        return self.breakers[host]
+
+    async def get(self, url, params=None):
+        host = _host(url)
+        breaker = self.breaker(host)
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            metrics.EXTERNAL_ERRORS.inc(host=host)
+            raise
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.max_per_host))
+
+        delay = 0.1
+        for attempt in range(self.retries + 1):
+            try:
+                async with semaphore:
+                    with metrics.EXTERNAL_LATENCY.time(host=host):
+                        response = await self._http().get(url, params=params)
+                if response.status_code < 500:
+                    breaker.record_success()
+                    return response
+                error = httpx.HTTPStatusError(
+                    f"{response.status_code} from {host}", request=response.request, response=response
+                )
+            except httpx.TransportError as e:
+                error = e
+            if attempt < self.retries:
+                await asyncio.sleep(delay)
+                delay *= 2
+        breaker.record_failure()
+        metrics.EXTERNAL_ERRORS.inc(host=host)
+        raise error
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._semaphores.clear()
+
+
+client = AsyncLookupClient()
+
+
+_flight = fanout.SingleFlight()
+
+
+async def _fetch_and_store(source, term, fetch):
+    value = await fetch(term)
+    await fanout.run_blocking(lookups.put, source, term, value)
+    return value
+
+
+async def _cached_async(source, term, fetch):
+    """Async `_cached`: misses are coalesced per term, stale entries are refreshed in a task."""
+    if not EXTERNAL_CACHE_ENABLED:
+        return await fetch(term)
+    # SQLite may wait on a writer's lock: never on the event loop
+    state, value = await fanout.run_blocking(lookups.get, source, term)
+    if state == STALE:
+        key = _claim_refresh(source, term)
+        if key is not None:
+            task = asyncio.get_running_loop().create_task(_refresh_async(key, source, term, fetch))
+            _background.add(task)
+            task.add_done_callback(_background.discard)
+    if state != MISS:
+        return value
+    return await _flight.do((source, lookups.key(term)), lambda: _fetch_and_store(source, term, fetch))
+
+
+async def _refresh_async(key, source, term, fetch):
+    try:
+        await _flight.do(key, lambda: _fetch_and_store(source, term, fetch))
     except Exception as e:
-        print(f"[Abbreviations.com ERROR] {e}")
+        logger.warning("[%s refresh ERROR] %s: %s", source, term, e)
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+
+async def _duckduckgo_async(term):
+    response = await client.get(
+        DUCKDUCKGO_URL,
+        params={"q": term, "format": "json", "no_redirect": "1", "no_html": "1"},
+    )
+    return _parse_duckduckgo(response.json(), term)
+
+
+async def _abbreviations_com_async(term):
+    response = await client.get(ABBREVIATIONS_COM_URL, params={"st": term, "qtype": "1"})
+    return _parse_abbreviations_com(response.text, term)
+
+
+SOURCES = {
+    "duckduckgo": _duckduckgo_async,
+    "abbreviations_com": _abbreviations_com_async,
+}
+
+
+async def fetch_from_duckduckgo_async(term: str):
+    try:
+        return await _cached_async("duckduckgo", term, _duckduckgo_async)
+    except Exception as e:
+        logger.warning("[DuckDuckGo ERROR] %s", e)
         return None
+
+
+async def fetch_from_abbreviations_com_async(term: str):
+    try:
+        return await _cached_async("abbreviations_com", term, _abbreviations_com_async)
+    except Exception as e:
+        logger.warning("[Abbreviations.com ERROR] %s", e)
+        return None
+
+
+async def fetch_definition(term: str):
+    """Query all sources concurrently and return the first non-empty answer (or None)."""
+    tasks = [
+        asyncio.create_task(fetch_from_duckduckgo_async(term)),
+        asyncio.create_task(fetch_from_abbreviations_com_async(term)),
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            if result:
+                return result
+        return None
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def prewarm(terms, concurrency=EXTERNAL_MAX_PER_HOST):
+    """
+    Look up every term in every source and cache the outcome, skipping entries
+    that are still fresh. Unlike a normal stale hit, stale entries are
+    refreshed before this returns.
+    """
+    terms = list(dict.fromkeys(t.strip() for t in terms if t.strip()))
+    stats = {"terms": len(terms), "fresh": 0, "found": 0, "not_found": 0, "failed": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def warm(source, fetch, term):
+        state, _ = await fanout.run_blocking(lookups.get, source, term)
+        if state == FRESH:
+            stats["fresh"] += 1
+            return
+        async with semaphore:
+            try:
+                value = await _flight.do((source, lookups.key(term)), lambda: _fetch_and_store(source, term, fetch))
+            except Exception as e:
+                logger.warning("[%s prewarm ERROR] %s: %s", source, term, e)
+                stats["failed"] += 1
+                return
+        stats["found" if value is not None else "not_found"] += 1
+
+    await asyncio.gather(*(warm(source, fetch, term) for term in terms for source, fetch in SOURCES.items()))
+    return stats
+
+
+async def close():
+    for task in list(_background):
+        task.cancel()
+    await client.aclose()
+
+
+async def _prewarm_and_close(terms):
+    try:
+        return await prewarm(terms)
+    finally:
+        await close()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("usage: python external_sources.py TERMS_FILE|-", file=sys.stderr)
+        return 2
+    stream = sys.stdin if argv[0] == "-" else open(argv[0], "r", encoding="utf-8")
+    with stream:
+        terms = stream.read().splitlines()
+    print(json.dumps(asyncio.run(_prewarm_and_close(terms))))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from config import FANOUT_WORKERS
+
+# Shared, bounded pool for blocking per-term lookups (wikipedia, local files)
+executor = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="fanout")
+
+
+async def run_blocking(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, fn, *args)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller starts the
+    lookup, everyone else arriving before it finishes awaits the same result.
+    The lookup runs in its own task, so a caller that is cancelled (e.g. its
+    client disconnected) stops waiting without failing the others.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+
+    async def do(self, key, coro_fn):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(coro_fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._finished(key, done))
+        return await asyncio.shield(task)
+
+    def _finished(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark retrieved so a failure nobody is waiting for anymore isn't logged as unhandled
+            task.exception()
+
+
+async def resolve_unique(terms, lookup, flight):
+    """
+    Run `lookup(term)` in the shared pool for every distinct term concurrently,
+    coalescing with identical in-flight lookups. Returns {term: result}.
+    """
+    unique = list(dict.fromkeys(terms))
+    results = await asyncio.gather(
+        *(flight.do(term, lambda term=term: run_blocking(lookup, term)) for term in unique)
+    )
+    return dict(zip(unique, results))
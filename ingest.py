@@ -0,0 +1,388 @@
+"""
+Streaming ingestion of new words, search items and abbreviations.
+
+    python ingest.py words.jsonl --target wordbank
+    python ingest.py nouns.csv --format csv --target data
+    python ingest.py abbrs.jsonl --target abbreviations
+    cat names.jsonl | python ingest.py - --target category:indian_names --server http://localhost:8000
+
+Input is read one record at a time (JSON lines, or CSV with a header row):
+    wordbank / data    {"category", "word"[, "letter"]}
+    abbreviations      {"abbr", "full_form"[, "description"]}
+    category:<name>    {"item"} or a bare JSON string (data/<name>.json)
+
+Records are validated, case-normalized like the registry does (category
+lowercase, letter uppercase) and deduplicated case-insensitively against the
+store and the rest of the input. JSON targets are rewritten once, atomically
+(temp file + os.replace) under data/ingest.lock; abbreviations go through
+cache.AbbreviationStore's append-only log in batches. Only counts are kept
+in memory; with --server, accepted entries are spooled to a temp file and,
+after the merge, POSTed to /admin/ingest in batches so a running server
+extends its in-memory indexes instead of reloading everything.
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import cache
+import data_registry
+import search_index
+import utils
+from config import ADMIN_TOKEN, INGEST_BATCH_SIZE
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock
+    fcntl = None
+
+WORD = re.compile(r"^[A-Za-z][A-Za-z' -]*$")
+CATEGORY_NAME = re.compile(r"^[A-Za-z0-9_-]+$")
+MAX_ERRORS_SHOWN = 20
+
+
+# ---------------------------------------------------------------------------
+# Reading and validation
+# ---------------------------------------------------------------------------
+
+def read_records(path, fmt="jsonl"):
+    """Yield (line number, record); unparsable lines come back as a ValueError instead of a record."""
+    stream = sys.stdin if path == "-" else open(path, "r", encoding="utf-8", newline="")
+    try:
+        if fmt == "csv":
+            for line_no, row in enumerate(csv.DictReader(stream), 2):
+                yield line_no, row
+            return
+        for line_no, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, ValueError(f"invalid JSON: {e.msg}")
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def normalize_word(record):
+    """-> (category, LETTER, word)"""
+    if not isinstance(record, dict):
+        raise ValueError("expected an object with category and word")
+    category = str(record.get("category") or "").strip().lower()
+    word = str(record.get("word") or "").strip()
+    if not category:
+        raise ValueError("missing category")
+    if not WORD.match(word):
+        raise ValueError(f"invalid word {word!r}")
+    letter = str(record.get("letter") or word[0]).strip().upper()
+    if letter != "_DEFAULT" and letter != word[0].upper():
+        raise ValueError(f"word {word!r} does not start with {letter!r}")
+    return category, letter, word
+
+
+def normalize_abbreviation(record):
+    if not isinstance(record, dict):
+        raise ValueError("expected an object with abbr and full_form")
+    abbr = str(record.get("abbr") or "").strip()
+    full_form = str(record.get("full_form") or "").strip()
+    if not abbr or not full_form:
+        raise ValueError("abbr and full_form are required")
+    return {"abbr": abbr, "full_form": full_form, "description": str(record.get("description") or "").strip()}
+
+
+def normalize_item(record):
+    item = record.get("item") if isinstance(record, dict) else record
+    if not isinstance(item, str) or not item.strip():
+        raise ValueError("expected a non-empty string or {\"item\": ...}")
+    return item.strip()
+
+
+def category_path(name):
+    if not CATEGORY_NAME.match(name):
+        raise ValueError(f"invalid category name {name!r}")
+    return Path(utils.DATA_PATH) / f"{name}.json"
+
+
+# ---------------------------------------------------------------------------
+# Targets
+# ---------------------------------------------------------------------------
+
+def _word_keys(document):
+    """{(category, word)}, lowercased, of a {Category: {Letter: [words]}} document."""
+    return {
+        (category.lower(), word.lower())
+        for category, letters in document.items() if isinstance(letters, dict)
+        for words in letters.values() for word in words
+    }
+
+
+def _read_json(path, default):
+    path = Path(path)
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else default
+
+
+class Accepted:
+    """
+    Counts accepted entries. With `keep`, it also spools them to a temp file so
+    they can be sent to a server after the merge without holding the input in
+    memory.
+    """
+
+    def __init__(self, keep=False):
+        self.count = 0
+        self._spool = tempfile.TemporaryFile("w+", encoding="utf-8") if keep else None
+
+    def add(self, entry):
+        self.count += 1
+        if self._spool is not None:
+            self._spool.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def batches(self, size=INGEST_BATCH_SIZE):
+        if self._spool is None:
+            return
+        self._spool.seek(0)
+        batch = []
+        for line in self._spool:
+            batch.append(json.loads(line))
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def close(self):
+        if self._spool is not None:
+            self._spool.close()
+
+
+def _write_atomic(path, document):
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class WordTarget:
+    """wordbank.json / data.json: {Category: {Letter: [words]}}, keeping the file's own key spelling."""
+
+    def __init__(self, path, accepted):
+        self.path = Path(path)
+        self.document = _read_json(self.path, {})
+        self.category_keys = {k.lower(): k for k, v in self.document.items() if isinstance(v, dict)}
+        self.seen = _word_keys(self.document)
+        self.accepted = accepted
+
+    def add(self, record):
+        category, letter, word = normalize_word(record)
+        if (category, word.lower()) in self.seen:
+            return False
+        self.seen.add((category, word.lower()))
+
+        key = self.category_keys.setdefault(category, category)
+        letters = self.document.setdefault(key, {})
+        letter_key = next((k for k in letters if k.upper() == letter), letter)
+        letters.setdefault(letter_key, []).append(word)
+        self.accepted.add({"category": category, "letter": letter, "word": word})
+        return True
+
+    def commit(self):
+        if self.accepted.count:
+            _write_atomic(self.path, self.document)
+
+
+class ItemTarget:
+    """data/<category>.json: a flat list of names."""
+
+    def __init__(self, path, accepted):
+        self.path = Path(path)
+        self.document = _read_json(self.path, [])
+        self.seen = {str(item).lower() for item in self.document}
+        self.accepted = accepted
+
+    def add(self, record):
+        item = normalize_item(record)
+        if item.lower() in self.seen:
+            return False
+        self.seen.add(item.lower())
+        self.document.append(item)
+        self.accepted.add({"item": item})
+        return True
+
+    def commit(self):
+        if self.accepted.count:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            _write_atomic(self.path, self.document)
+
+
+class AbbreviationTarget:
+    """The abbreviation cache; written batch by batch through its append-only log."""
+
+    def __init__(self, accepted, store=None):
+        self.store = store or cache.store
+        self.seen = set(self.store.all())   # keys are lowercased abbrs
+        self.batch = []
+        self.accepted = accepted
+
+    def add(self, record):
+        entry = normalize_abbreviation(record)
+        if entry["abbr"].lower() in self.seen:
+            return False
+        self.seen.add(entry["abbr"].lower())
+        self.batch.append(entry)
+        if len(self.batch) >= INGEST_BATCH_SIZE:
+            self._flush()
+        return True
+
+    def _flush(self):
+        if self.batch:
+            self.store.save_many(self.batch)
+            for entry in self.batch:
+                self.accepted.add(entry)
+            self.batch = []
+
+    def commit(self):
+        self._flush()
+
+
+WORD_FILES = {"wordbank": "wordbank", "data": "abbreviations"}   # target -> data_registry.DATA_FILES key
+
+
+def make_target(target, accepted):
+    if target in WORD_FILES:
+        return WordTarget(data_registry.DATA_FILES[WORD_FILES[target]], accepted)
+    if target == "abbreviations":
+        return AbbreviationTarget(accepted)
+    if target.startswith("category:"):
+        return ItemTarget(category_path(target.split(":", 1)[1]), accepted)
+    raise ValueError(f"Unknown target {target!r}")
+
+
+@contextmanager
+def _ingest_lock():
+    if fcntl is None:
+        yield
+        return
+    lock_path = Path(utils.DATA_PATH) / "ingest.lock"
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a+") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def ingest(records, target, keep=False):
+    """
+    Merge an iterable of (line_no, record) into `target`. Returns (stats,
+    Accepted, errors); with `keep`, Accepted.batches() replays the accepted entries.
+    """
+    stats = {"read": 0, "accepted": 0, "duplicates": 0, "invalid": 0}
+    errors = []
+    accepted = Accepted(keep)
+    with _ingest_lock():
+        store = make_target(target, accepted)
+        for line_no, record in records:
+            stats["read"] += 1
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                if not store.add(record):
+                    stats["duplicates"] += 1
+            except ValueError as e:
+                stats["invalid"] += 1
+                if len(errors) < MAX_ERRORS_SHOWN:
+                    errors.append(f"line {line_no}: {e}")
+        store.commit()
+    stats["accepted"] = accepted.count
+    return stats, accepted, errors
+
+
+# ---------------------------------------------------------------------------
+# Live server update (POST /admin/ingest)
+# ---------------------------------------------------------------------------
+
+def apply_live(target, entries):
+    """
+    Extend the in-memory indexes with entries already merged into the files.
+    The files are the source of truth: entries they don't contain are skipped.
+    """
+    if target in WORD_FILES:
+        on_disk = _word_keys(_read_json(data_registry.DATA_FILES[WORD_FILES[target]], {}))
+        snapshot = data_registry.get()
+        additions, applied = {}, 0
+        for entry in entries:
+            category, letter, word = normalize_word(entry)
+            if (category, word.lower()) not in on_disk:
+                continue
+            if target == "wordbank":
+                existing = snapshot.wordbank_index.words(category, letter)
+            else:
+                existing = getattr(snapshot, category, {}).get(letter, ()) if category in ("nouns", "prepositions") else ()
+            if word.lower() in {w.lower() for w in existing}:
+                continue  # e.g. the file watcher already reloaded the merged file
+            additions.setdefault(category, {}).setdefault(letter, []).append(word)
+            applied += 1
+        if additions:
+            data_registry.extend_words(target, additions)
+        return applied
+
+    if target == "abbreviations":
+        stored = cache.store.all()  # replays the log lines the CLI appended
+        return sum(1 for entry in entries if normalize_abbreviation(entry)["abbr"].lower() in stored)
+
+    if target.startswith("category:"):
+        name = target.split(":", 1)[1]
+        on_disk = {str(item).lower() for item in _read_json(category_path(name), [])}
+        items = [item for item in map(normalize_item, entries) if item.lower() in on_disk]
+        index = search_index.extend(name, items) if items else None
+        return len(items) if index is not None else 0
+
+    raise ValueError(f"Unknown target {target!r}")
+
+
+def push(server, target, batches):
+    import httpx
+
+    applied = 0
+    headers = {"X-Admin-Token": ADMIN_TOKEN} if ADMIN_TOKEN else {}
+    with httpx.Client(base_url=server, timeout=30, headers=headers) as client:
+        for batch in batches:
+            response = client.post("/admin/ingest", json={"target": target, "entries": batch})
+            response.raise_for_status()
+            applied += response.json()["applied"]
+    return applied
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream new words, items or abbreviations into the data stores")
+    parser.add_argument("input", help="JSONL/CSV file, or - for stdin")
+    parser.add_argument("--target", required=True, help="wordbank, data, abbreviations or category:<name>")
+    parser.add_argument("--format", choices=("jsonl", "csv"), default=None, help="default: from the file extension")
+    parser.add_argument("--server", help="base URL of a running server to update in place")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.input.lower().endswith(".csv") else "jsonl")
+    stats, accepted, errors = ingest(read_records(args.input, fmt), args.target, keep=bool(args.server))
+    for error in errors:
+        print(error, file=sys.stderr)
+    try:
+        if args.server and accepted.count:
+            stats["applied_live"] = push(args.server, args.target, accepted.batches())
+    finally:
+        accepted.close()
+    print(json.dumps(stats))
+    return 1 if stats["invalid"] and not stats["accepted"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
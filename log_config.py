@@ -0,0 +1,97 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+
+from config import LOG_FORMAT, LOG_LEVEL, LOG_LEVELS, LOG_SAMPLE_RATE
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; extra={"fields": {...}} is merged into it."""
+
+    def format(self, record):
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            payload.update(fields)
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def parse_levels(spec):
+    """'cache=DEBUG,routes.tricks=WARNING' -> {'cache': 'DEBUG', 'routes.tricks': 'WARNING'}"""
+    levels = {}
+    for part in spec.split(","):
+        name, _, level = part.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level=LOG_LEVEL, levels=LOG_LEVELS, fmt=LOG_FORMAT):
+    """
+    Route all records through a QueueHandler so request threads only enqueue;
+    a single listener thread formats and writes them. Safe to call twice.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stderr)
+    if fmt == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(level.upper())
+    for name, module_level in parse_levels(levels).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class SampledLogger:
+    """
+    For per-request debug events on hot paths: the level check comes first,
+    then only `rate` of the calls are kept, so a disabled or sampled-out call
+    costs one comparison and no formatting.
+    """
+
+    def __init__(self, logger, rate=LOG_SAMPLE_RATE):
+        self.logger = logger
+        self.rate = rate
+
+    def debug(self, msg, *args, **kwargs):
+        if self.logger.isEnabledFor(logging.DEBUG) and (self.rate >= 1 or random.random() < self.rate):
+            self.logger.debug(msg, *args, stacklevel=2, **kwargs)
+
+    def info(self, msg, *args, **kwargs):
+        if self.logger.isEnabledFor(logging.INFO) and (self.rate >= 1 or random.random() < self.rate):
+            self.logger.info(msg, *args, stacklevel=2, **kwargs)
+
+
+def sampled(name, rate=LOG_SAMPLE_RATE):
+    return SampledLogger(logging.getLogger(name), rate)
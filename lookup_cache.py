@@ -0,0 +1,144 @@
+"""
+Persistent cache for external definition lookups (see external_sources).
+
+SQLite on disk in WAL mode, so every worker shares one file and readers never
+wait on a writer. Answers and "not found" results get separate TTLs; an entry
+past its TTL is still returned as STALE for `stale_for` more seconds so the
+caller can answer immediately and refresh in the background. The table is
+kept under `max_entries` by dropping the least recently read rows.
+
+Every method does blocking SQLite I/O; async callers go through
+fanout.run_blocking.
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+# Reads refresh accessed_at at most this often, so hot terms don't turn every hit into a write
+TOUCH_INTERVAL = 60
+# Check the size bound every this many writes
+PRUNE_EVERY = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lookups (
+    source      TEXT NOT NULL,
+    term        TEXT NOT NULL,
+    value       TEXT,            -- JSON, NULL for a recorded "not found"
+    expires_at  REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (source, term)
+)
+"""
+
+
+class LookupCache:
+    def __init__(self, path, max_entries, ttl, negative_ttl, stale_for):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_for = stale_for
+        self._local = threading.local()   # sqlite3 connections are per thread
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._count_lock = threading.Lock()
+        self._size = None     # row count: counted once on open, kept up by put(), resynced by prune()
+        self._writes = 0
+        self.hits = self.stale_hits = self.misses = 0
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.execute(SCHEMA)
+                    (self._size,) = conn.execute("SELECT COUNT(*) FROM lookups").fetchone()
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def key(term):
+        return term.strip().lower()
+
+    def get(self, source, term):
+        """-> (FRESH | STALE | MISS, value); value None with FRESH/STALE is a cached "not found"."""
+        conn = self._conn()
+        key = self.key(term)
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM lookups WHERE source = ? AND term = ?", (source, key)
+        ).fetchone()
+        now = time.time()
+        if row is None or now >= row[1] + self.stale_for:
+            self.misses += 1
+            return MISS, None
+        value, expires_at, accessed_at = row
+        if now - accessed_at > TOUCH_INTERVAL:
+            conn.execute("UPDATE lookups SET accessed_at = ? WHERE source = ? AND term = ?", (now, source, key))
+        if now < expires_at:
+            self.hits += 1
+            state = FRESH
+        else:
+            self.stale_hits += 1
+            state = STALE
+        return state, (json.loads(value) if value is not None else None)
+
+    def put(self, source, term, value):
+        now = time.time()
+        ttl = self.ttl if value is not None else self.negative_ttl
+        row = (json.dumps(value, ensure_ascii=False) if value is not None else None, now + ttl, now,
+               source, self.key(term))
+        conn = self._conn()
+        updated = conn.execute(
+            "UPDATE lookups SET value = ?, expires_at = ?, accessed_at = ? WHERE source = ? AND term = ?", row
+        ).rowcount
+        if not updated:
+            conn.execute(
+                "INSERT OR REPLACE INTO lookups (value, expires_at, accessed_at, source, term) VALUES (?, ?, ?, ?, ?)",
+                row,
+            )
+        with self._count_lock:
+            if not updated:
+                self._size += 1
+            self._writes += 1
+            prune = self._writes % PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+    def prune(self):
+        conn = self._conn()
+        (size,) = conn.execute("SELECT COUNT(*) FROM lookups").fetchone()
+        if size > self.max_entries:
+            size -= conn.execute(
+                "DELETE FROM lookups WHERE rowid IN (SELECT rowid FROM lookups ORDER BY accessed_at LIMIT ?)",
+                (size - self.max_entries,),
+            ).rowcount
+        with self._count_lock:
+            self._size = size
+
+    def clear(self):
+        self._conn().execute("DELETE FROM lookups")
+        with self._count_lock:
+            self._size = 0
+
+    def stats(self):
+        """Counters only, no query: rows other workers added show up after the next prune."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": self._size or 0,
+            "maxsize": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+        }
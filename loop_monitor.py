@@ -0,0 +1,71 @@
+"""
+Event-loop lag monitor.
+
+A task on the loop wakes up every `interval` seconds, records how late it
+was (event_loop_lag_seconds) and stamps a heartbeat. A watchdog thread checks
+the heartbeat; when the loop has been silent for longer than `threshold`,
+something is running blocking code on it, and the watchdog logs the loop
+thread's current stack, which names the offending handler while it blocks.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class LoopMonitor:
+    def __init__(self, interval, threshold):
+        self.interval = interval
+        self.threshold = threshold
+        self._heartbeat = time.monotonic()
+        self._loop_thread = None
+        self._task = None
+        self._stop = threading.Event()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+
+    async def _probe(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            metrics.EVENT_LOOP_LAG.observe(lag)
+            self._heartbeat = now
+            if lag > self.threshold:
+                logger.warning("[LOOP] Event loop was blocked for %.0f ms", lag * 1000)
+
+    def _watch(self):
+        reported = None
+        while not self._stop.wait(self.interval):
+            beat = self._heartbeat
+            if time.monotonic() - beat <= self.threshold + self.interval or beat == reported:
+                continue
+            reported = beat  # one report per stall
+            metrics.EVENT_LOOP_STALLS.inc()
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = "".join(traceback.format_stack(frame)) if frame else "(loop thread not found)\n"
+            logger.warning("[LOOP] Event loop blocked > %.0f ms, currently running:\n%s",
+                           self.threshold * 1000, stack)
+
+    def start(self):
+        """Call from the running loop (e.g. the app lifespan)."""
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._probe())
+        self._watchdog.start()
+        return self
+
+    async def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
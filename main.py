@@ -1,29 +1,93 @@
+from contextlib import asynccontextmanager
+import anyio.to_thread
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from routes.tricks import router as tricks_router           # Old 3 categories
-from routes.new_tricks import router as new_tricks_router   # New 2 categories
+from log_config import setup_logging
+setup_logging()
+
+import data_registry
+import external_sources
+import metrics
+import response_cache
+import warmup
+from config import (
+    ADMISSION_ENABLED,
+    DATA_WATCH_INTERVAL,
+    LOOP_LAG_INTERVAL,
+    LOOP_LAG_THRESHOLD,
+    STARTUP_WARMUP,
+    SYNC_ROUTE_THREADS,
+)
+from admission import AdmissionMiddleware
+from loop_monitor import LoopMonitor
+from response_cache import ResponseCacheMiddleware
+from routes.dispatcher import GENERATORS, router as dispatcher_router, tricks_cache_key   # GET /api/(v1/)tricks, every type
+from routes.tricks import router as tricks_router   # batch + nickname stream
 from routes.search import router as search_router
+from routes.admin import router as admin_router
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load all data once: before the first request ("eager"), right after startup
+    # in a background thread ("background"), or on the first request ("lazy")
+    warmup.on_startup(STARTUP_WARMUP)
+    watcher = data_registry.start_watcher(DATA_WATCH_INTERVAL) if DATA_WATCH_INTERVAL > 0 else None
+    # Sync routes run in this bounded pool; async routes push blocking work to fanout.run_blocking
+    anyio.to_thread.current_default_thread_limiter().total_tokens = SYNC_ROUTE_THREADS
+    monitor = LoopMonitor(LOOP_LAG_INTERVAL, LOOP_LAG_THRESHOLD).start() if LOOP_LAG_INTERVAL > 0 else None
+    yield
+    if monitor:
+        await monitor.stop()
+    if watcher:
+        watcher.stop()
+    await external_sources.close()
+
+# Cached tricks were built from the old data
+data_registry.subscribe(lambda snapshot: response_cache.responses.clear())
+
+app = FastAPI(title="Trick Generator API", lifespan=lifespan)
 
-app = FastAPI(title="Trick Generator API")
+# Per-route concurrency limits and per-client rate limits; inside the response
+# cache so cache hits are never shed, and inside CORS so browsers can read the
+# 429/503 and its Retry-After
+if ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
 
+# Identical (normalized) trick requests are answered from memory
+app.add_middleware(
+    ResponseCacheMiddleware,
+    key_builders={"/api/tricks": tricks_cache_key, "/api/v1/tricks": tricks_cache_key},
+)
+
+# Outside the response cache, so cached responses carry the CORS headers too
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After", "X-Cache"],
 )
 
+# Outermost, so cache hits are timed too
+app.add_middleware(metrics.MetricsMiddleware, trick_types=GENERATORS)
+
 # Include all routers
-app.include_router(tricks_router)        # old
-app.include_router(new_tricks_router)    # new
+app.include_router(dispatcher_router)
+app.include_router(tricks_router)
 app.include_router(search_router)
+app.include_router(admin_router)
 
 @app.get("/")
 def home():
     return {"message": "Welcome to the Trick Generator API"}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return metrics.render()
@@ -0,0 +1,251 @@
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from config import METRICS_ENABLED
+
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels_text(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels_text(self.label_names, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}   # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.label_names + ("le",)
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels_text(names, key + (bound,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels_text(self.label_names, key)} {series[-1]}")
+            lines.append(f"{self.name}_count{_labels_text(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Value read from a callback at scrape time: fn() -> {label values tuple: number}."""
+
+    def __init__(self, name, help_text, labels, fn):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.fn = fn
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for key, value in sorted(self.fn().items()):
+            lines.append(f"{self.name}{_labels_text(self.label_names, key)} {value}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __call__(self, fn):
+        return fn
+
+
+_NOOP = _NoopTimer()
+_metrics = []
+
+
+def register(metric):
+    _metrics.append(metric)
+    return metric
+
+
+def render():
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+REQUEST_LATENCY = register(Histogram(
+    "http_request_duration_seconds", "Request latency by route and trick type", ("route", "method", "type")))
+REQUEST_ERRORS = register(Counter(
+    "http_request_errors_total", "Responses with status >= 500", ("route", "method")))
+STAGE_LATENCY = register(Histogram(
+    "stage_duration_seconds", "Time spent per processing stage", ("component", "stage")))
+EXTERNAL_LATENCY = register(Histogram(
+    "external_request_duration_seconds", "External lookup latency by host", ("host",)))
+EXTERNAL_ERRORS = register(Counter(
+    "external_request_errors_total", "Failed external lookups by host", ("host",)))
+CACHE_EVENTS = register(Counter(
+    "cache_events_total", "Cache lookups by cache and result (hit/miss)", ("cache", "result")))
+EVENT_LOOP_LAG = register(Histogram(
+    "event_loop_lag_seconds", "How late the event loop ran a scheduled wake-up"))
+EVENT_LOOP_STALLS = register(Counter(
+    "event_loop_stalls_total", "Times the event loop was blocked longer than LOOP_LAG_THRESHOLD"))
+ADMISSION_REJECTED = register(Counter(
+    "admission_rejected_total", "Requests shed by admission control, by pool and reason", ("pool", "reason")))
+
+_caches = {}
+
+
+def _cache_stats():
+    values = {}
+    for name, cache in list(_caches.items()):
+        for stat, value in cache.stats().items():
+            values[(name, stat)] = value
+    return values
+
+
+CACHE_STATS = register(Gauge(
+    "cache_stats", "In-process cache size/hits/misses/evictions/hit_ratio", ("cache", "stat"), _cache_stats))
+
+
+def register_cache(name, cache):
+    """Expose an object with a stats() -> dict method under cache_stats{cache=name}."""
+    _caches[name] = cache
+
+
+def timed(component, stage):
+    """
+    `with timed("tricks", "extract_letters"):` or `@timed("cache", "save_many")`.
+    With METRICS_ENABLED off this is a shared no-op object.
+    """
+    if not METRICS_ENABLED:
+        return _NOOP
+    return _StageTimer(component, stage)
+
+
+class _StageTimer(_Timer):
+    __slots__ = ()
+
+    def __init__(self, component, stage):
+        super().__init__(STAGE_LATENCY, {"component": component, "stage": stage})
+
+    def __call__(self, fn):
+        component, stage = self.labels["component"], self.labels["stage"]
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _StageTimer(component, stage):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+# Label values must come from a fixed set, or every junk request would add a series
+METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+ROUTE_LABEL = "metrics.route"   # scope key an outer middleware sets when it answers without routing
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency per matched route (and ?type=) plus
+    5xx counts. Only registered `trick_types` are used as the type label, others
+    are "other"; requests that matched no route are "unmatched".
+    """
+
+    def __init__(self, app, trick_types=()):
+        self.app = app
+        self.trick_types = trick_types
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            # Requests answered by an outer middleware (e.g. response cache hits) never reach routing
+            path = getattr(route, "path", None) or scope.get(ROUTE_LABEL) or "unmatched"
+            method = scope["method"] if scope["method"] in METHODS else "other"
+            trick_type = ""
+            if path.startswith(("/api/tricks", "/api/v1/tricks")):
+                for part in scope.get("query_string", b"").decode("latin-1").split("&"):
+                    if part.startswith("type="):
+                        trick_type = part[5:] if part[5:] in self.trick_types else "other"
+                        break
+            REQUEST_LATENCY.observe(time.perf_counter() - start, route=path, method=method, type=trick_type)
+            if status >= 500:
+                REQUEST_ERRORS.inc(route=path, method=method)
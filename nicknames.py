@@ -0,0 +1,105 @@
+"""
+Nicknames from nickname_templates.json ({part1} ... {partN}, N = 2..9) over
+the letter-indexed wordbank. Exposes the same feasible/word_lists/explain
+interface as SentenceSolver, plus a stateless paged walk over the whole
+combinatorial space:
+
+    index -> (template, word per slot) by mixed-radix decoding, and
+    cursor -> index through an affine permutation (a * cursor + b) mod total
+    chosen from the seed, so pages look shuffled yet never repeat or skip.
+"""
+import random
+from math import gcd, prod
+
+from routes.generate_template_sentence import render_plan
+from sentence_solver import DEFAULT_KEY
+
+# Part of speech tried first for a part; the last part names the thing, the rest describe it
+HEAD_PARTS = ("noun", "adjective")
+MODIFIER_PARTS = ("adjective", "noun")
+
+
+class NicknameGenerator:
+    def __init__(self, template_index, wordbank_index):
+        self.templates = template_index
+        self.wordbank = wordbank_index
+        self.head_order = self._category_order(HEAD_PARTS)
+        self.modifier_order = self._category_order(MODIFIER_PARTS)
+
+    def _category_order(self, preferred):
+        resolved = [c for c in (self.wordbank.resolve(base) for base in preferred) if c]
+        # Any other category can still supply a word for an awkward letter
+        return tuple(resolved + sorted(c for c in self.wordbank.categories if c not in resolved))
+
+    def _words(self, position, length, letter):
+        categories = self.head_order if position == length - 1 else self.modifier_order
+        for category in categories:
+            words = self.wordbank.words(category, letter)
+            if words:
+                return words
+        for category in categories:
+            words = self.wordbank.words(category, DEFAULT_KEY)
+            if words:
+                return words
+        return ()
+
+    def feasible(self, letters):
+        if any(not self._words(pos, len(letters), letter) for pos, letter in enumerate(letters)):
+            return []
+        return list(self.templates.bucket(len(letters)))
+
+    def word_lists(self, plan, letters):
+        return [self._words(pos, len(letters), letter) for pos, letter in enumerate(letters)]
+
+    def explain(self, letters):
+        if not self.templates.bucket(len(letters)):
+            return "No nickname templates for this input length."
+        for pos, letter in enumerate(letters):
+            if not self._words(pos, len(letters), letter):
+                return f"No word starts with '{letter}' (letter {pos + 1})."
+        return "No nickname template fits these letters."
+
+    def solve(self, letters, rng=random):
+        plans = self.feasible(letters)
+        if not plans:
+            return None, None, self.explain(letters)
+        plan = rng.choice(plans)
+        return render_plan(plan, [rng.choice(w) for w in self.word_lists(plan, letters)]), plan, None
+
+    def space(self, letters):
+        return NicknameSpace([(plan, self.word_lists(plan, letters)) for plan in self.feasible(letters)])
+
+
+class NicknameSpace:
+    """Every (template, words) combination for one input, addressable by index."""
+
+    def __init__(self, candidates):
+        self.blocks = [(plan, lists, prod(len(w) for w in lists)) for plan, lists in candidates]
+        self.total = sum(size for _, _, size in self.blocks)
+
+    def __getitem__(self, index):
+        for plan, lists, size in self.blocks:
+            if index < size:
+                words = []
+                for word_list in reversed(lists):
+                    index, digit = divmod(index, len(word_list))
+                    words.append(word_list[digit])
+                return render_plan(plan, words[::-1])
+            index -= size
+        raise IndexError(index)
+
+    def permutation(self, seed):
+        """(a, b) with gcd(a, total) == 1, so cursor -> (a * cursor + b) % total is a bijection."""
+        if self.total <= 1:
+            return 1, 0
+        rng = random.Random(seed)
+        a = rng.randrange(1, self.total)
+        while gcd(a, self.total) != 1:
+            a = rng.randrange(1, self.total)
+        return a, rng.randrange(self.total)
+
+    def page(self, seed, cursor, limit):
+        """Lazily yield (cursor, nickname) for cursor .. cursor + limit - 1."""
+        a, b = self.permutation(seed)
+        for position in range(cursor, min(cursor + limit, self.total)):
+            yield position, self[(a * position + b) % self.total]
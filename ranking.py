@@ -0,0 +1,116 @@
+"""
+Scoring and top-k selection for /api/tricks?top_k=N.
+
+A candidate is one word per letter. Its score mixes cheap features:
+  frequency     how many wordbank lists contain each word (common words recur
+                across categories; no external frequency list ships with the repo)
+  length        long words are penalized
+  alliteration  consonant sounds repeated within and across the words, not
+                counting each word's opening sound (the slot letter forces it)
+  rhythm        even syllable counts across the words
+Word lists are pruned to their best words first so that the enumerated product
+stays within RANK_CANDIDATE_BUDGET, and heapq.nlargest keeps only k results.
+"""
+import heapq
+import itertools
+import re
+from collections import Counter
+from functools import lru_cache
+from math import log1p, sqrt
+
+from config import RANK_CANDIDATE_BUDGET
+
+WEIGHTS = {"frequency": 1.0, "length": 0.5, "alliteration": 1.0, "rhythm": 0.5}
+COMFORTABLE_LENGTH = 6
+
+_VOWEL_GROUPS = re.compile(r"[aeiouy]+")
+_DOUBLED = re.compile(r"([a-z])\1")
+# Digraphs first; "c" is hard unless an e/i/y follows
+_CONSONANT_SOUNDS = re.compile(r"ch|sh|th|ph|ck|qu|[bcdfgjklmnpqrstvwxz]")
+_SOUND_OF = {"ph": "f", "ck": "k", "qu": "k", "q": "k", "c": "k"}
+
+
+def syllables(word):
+    word = word.lower()
+    count = len(_VOWEL_GROUPS.findall(word))
+    if word.endswith("e") and count > 1 and not word.endswith(("le", "ee")):
+        count -= 1
+    return max(1, count)
+
+
+def consonant_sounds(word):
+    """Consonant sounds of `word` after its opening one, e.g. 'Chatter' -> ('t', 'r')."""
+    lowered = _DOUBLED.sub(r"\1", word.lower())
+    sounds = []
+    for match in _CONSONANT_SOUNDS.finditer(lowered):
+        sound = match.group()
+        if sound == "c" and lowered[match.end():match.end() + 1] in ("e", "i", "y"):
+            sound = "s"
+        else:
+            sound = _SOUND_OF.get(sound, sound)
+        sounds.append((match.start(), sound))
+    if sounds and sounds[0][0] == 0:
+        sounds = sounds[1:]   # the opening sound is the slot letter, not a choice
+    return tuple(sound for _, sound in sounds)
+
+
+class Ranker:
+    def __init__(self, wordbank_index):
+        counts = Counter()
+        for category in wordbank_index.categories:
+            for letter in wordbank_index.letters(category):
+                counts.update(w.lower() for w in wordbank_index.words(category, letter))
+        self.counts = counts
+        self._features = lru_cache(maxsize=65536)(self._word_features)
+
+    def _word_features(self, word):
+        """(unary score, syllables, consonant sounds) for one word."""
+        lowered = word.lower()
+        unary = (
+            WEIGHTS["frequency"] * log1p(self.counts.get(lowered, 0))
+            - WEIGHTS["length"] * max(0, len(word) - COMFORTABLE_LENGTH)
+        )
+        return unary, syllables(word), consonant_sounds(word)
+
+    def score(self, words):
+        features = [self._features(w) for w in words]
+        unary = sum(f[0] for f in features) / len(features)
+        if len(features) < 2:
+            return unary
+        # Share of the chosen consonant sounds that repeat one heard earlier in the candidate
+        sounds = [s for f in features for s in f[2]]
+        alliteration = (len(sounds) - len(set(sounds))) / len(sounds) if sounds else 0.0
+        # Plain float spread: statistics.pstdev's exact Fraction arithmetic dominated top_k
+        counts = [f[1] for f in features]
+        mean = sum(counts) / len(counts)
+        rhythm = sqrt(sum((c - mean) ** 2 for c in counts) / len(counts))
+        return unary + WEIGHTS["alliteration"] * alliteration - WEIGHTS["rhythm"] * rhythm
+
+    def prune(self, word_list, width):
+        return heapq.nlargest(width, sorted(set(word_list)), key=lambda w: self._features(w)[0])
+
+    def top_k(self, groups, k, budget=RANK_CANDIDATE_BUDGET):
+        """
+        groups: [(key, [word list per slot]), ...], e.g. one per feasible template.
+        Returns up to k (score, key, words) tuples, best first.
+        """
+        groups = [(key, lists) for key, lists in groups if lists and all(lists)]
+        if not groups:
+            return []
+        per_group = max(1, budget // len(groups))
+
+        def candidates():
+            for order, (key, lists) in enumerate(groups):
+                width = max(1, int(per_group ** (1 / len(lists))))
+                pruned = [self.prune(words, width) for words in lists]
+                for words in itertools.product(*pruned):
+                    yield self.score(words), -order, key, words
+
+        best = heapq.nlargest(k, candidates(), key=lambda c: (c[0], c[1], c[3]))
+        return [(round(score, 4), key, words) for score, _, key, words in best]
+
+
+@lru_cache(maxsize=2)
+def ranker_for(wordbank_index):
+    """One Ranker per loaded wordbank (the current and, briefly, the previous snapshot)."""
+    return Ranker(wordbank_index)
@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+import metrics
+from config import RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL
+
+
+class TTLCache:
+    """Thread-safe LRU with a per-entry TTL and hit/miss/eviction counters."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] <= now:
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+responses = TTLCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+metrics.register_cache("responses", responses)
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """
+    Serves repeated GETs from `responses`. `key_builders` maps a path to a
+    function(request) -> hashable key (or None to bypass), so each router owns
+    its own input normalization.
+    """
+
+    def __init__(self, app, key_builders, cache=responses):
+        super().__init__(app)
+        self.key_builders = key_builders
+        self.cache = cache
+
+    async def dispatch(self, request, call_next):
+        build_key = self.key_builders.get(request.url.path) if request.method == "GET" else None
+        key = build_key(request) if build_key else None
+        if key is None:
+            return await call_next(request)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            body, status, raw_headers = cached
+            # No route is matched for a hit; label it with the (fixed) cached path
+            request.scope[metrics.ROUTE_LABEL] = request.url.path
+            return _replay(body, status, raw_headers, b"HIT")
+
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        # Keep every header the route (and inner middleware) set, not just the content type
+        raw_headers = [(k, v) for k, v in response.raw_headers if k != b"x-cache"]
+        self.cache.set(key, (body, response.status_code, raw_headers))
+        return _replay(body, response.status_code, raw_headers, b"MISS")
+
+
+def _replay(body, status, raw_headers, cache_status):
+    response = Response(body, status_code=status)
+    response.raw_headers = raw_headers + [(b"x-cache", cache_status)]
+    return response
@@ -0,0 +1,62 @@
+import hmac
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from pydantic import BaseModel, Field
+
+import data_registry
+import external_sources
+import ingest
+import response_cache
+import wiki_utils
+from config import ADMIN_TOKEN, INGEST_BATCH_SIZE
+
+LOOPBACK = {"127.0.0.1", "::1"}
+
+def require_admin(request: Request, x_admin_token: Optional[str] = Header(None)):
+    """ADMIN_TOKEN in X-Admin-Token, or (with no token configured) a loopback client."""
+    if ADMIN_TOKEN:
+        if x_admin_token is None or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+            raise HTTPException(status_code=401, detail="Invalid or missing admin token")
+        return
+    if request.client is None or request.client.host not in LOOPBACK:
+        raise HTTPException(status_code=403, detail="Admin endpoints only answer localhost unless ADMIN_TOKEN is set")
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+@router.post("/reload")
+def reload_data():
+    """Re-read data.json, wordbank.json and the templates and swap them in atomically (in every worker with WORKER_SYNC)."""
+    snapshot = data_registry.reload()
+    return {
+        "status": "reloaded",
+        "loaded_at": snapshot.loaded_at,
+        "generation": snapshot.generation,
+        "wordbank_categories": len(snapshot.wordbank),
+        "templates": len(snapshot.templates),
+    }
+
+@router.get("/cache-stats")
+def cache_stats():
+    return {
+        "responses": response_cache.responses.stats(),
+        "wiki_details": wiki_utils.details_cache.stats(),
+        "external_lookups": external_sources.lookups.stats(),
+    }
+
+class IngestRequest(BaseModel):
+    target: str = Field(..., description="wordbank, data, abbreviations or category:<name>")
+    entries: List[dict] = Field(..., max_length=INGEST_BATCH_SIZE)
+
+@router.post("/ingest")
+def ingest_entries(request: IngestRequest):
+    """
+    Extend the in-memory indexes with entries ingest.py has already merged
+    into the files, without a full reload. Entries not found in the files
+    are ignored.
+    """
+    try:
+        applied = ingest.apply_live(request.target, request.entries)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"target": request.target, "applied": applied}
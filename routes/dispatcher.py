@@ -0,0 +1,93 @@
+"""
+Single entry point for every trick type: GET /api/v1/tricks, plus the
+unversioned /api/tricks kept for existing clients.
+
+Generator modules register one TrickGenerator per type with `register`.
+Dispatch is a dict lookup. Letters are normalized once, by the parser the
+generator registered, and every generator gets the same data_registry
+snapshot, so new types never collide on a route or an enum.
+"""
+from typing import Callable, NamedTuple, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+import data_registry
+from config import RANK_MAX_TOP_K
+from log_config import sampled
+from metrics import timed
+
+router = APIRouter()
+log = sampled(__name__)  # per-request events
+
+
+class TrickGenerator(NamedTuple):
+    name: str
+    normalize: Callable   # raw `letters` -> list of parts
+    generate: Callable    # (snapshot, parts, TrickOptions) -> response dict
+
+
+class TrickOptions(NamedTuple):
+    type: str
+    seed: Optional[int]
+    top_k: Optional[int]
+
+
+GENERATORS = {}
+
+
+def register(name, normalize):
+    """Decorator: serve `fn(snapshot, parts, options)` as trick type `name`."""
+    def decorator(fn):
+        if name in GENERATORS:
+            raise ValueError(f"Trick type {name!r} is already registered")
+        GENERATORS[name] = TrickGenerator(name, normalize, fn)
+        return fn
+    return decorator
+
+
+def tricks_cache_key(request):
+    """
+    Response-cache key: query params with `letters` replaced by the type's
+    normalized parts, plus the shared data generation. A hit never calls
+    data_registry.get(), so after another worker reloads, the new generation
+    turns hits into misses and the route picks up the new data.
+    """
+    params = request.query_params
+    generator = GENERATORS.get(params.get("type"))
+    if generator is None or "letters" not in params:
+        return None
+    others = tuple(sorted((k, v) for k, v in params.multi_items() if k != "letters"))
+    return ("/api/tricks", data_registry.shared_generation(), tuple(generator.normalize(params["letters"])), others)
+
+
+@router.get("/api/v1/tricks")
+@router.get("/api/tricks")
+def get_tricks(
+    type: str = Query(..., description="Type of trick"),
+    letters: str = Query(..., description="Comma-separated letters or words"),
+    seed: Optional[int] = Query(None, description="Same seed + letters -> same trick"),
+    top_k: Optional[int] = Query(None, ge=1, le=RANK_MAX_TOP_K, description="Return the N best-scoring tricks"),
+):
+    generator = GENERATORS.get(type)
+    if generator is None:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown trick type {type!r}; expected one of: {', '.join(sorted(GENERATORS))}",
+        )
+    log.info("[API] Trick Type: %s, Input Letters Raw: %r", type, letters)
+
+    with timed("tricks", "extract_letters"):
+        input_parts = generator.normalize(letters)
+    log.debug("[DEBUG] Normalized Input Letters: %s", input_parts)
+
+    if not input_parts:
+        return {"trick": "Invalid input."}
+
+    with timed("tricks", "data_load"):
+        data = data_registry.get()
+
+    return generator.generate(data, input_parts, TrickOptions(type, seed, top_k))
+
+
+# Built-in generators register themselves on import
+from . import new_tricks, tricks  # noqa: E402,F401
@@ -1,9 +1,14 @@
 import json
 import random
-import inflect
+from functools import lru_cache
 from pathlib import Path
+from typing import NamedTuple
+
+from log_config import sampled
+from wordbank_index import PLURAL_BASES, build_wordbank_index
+
+log = sampled(__name__)
 
-p = inflect.engine()
 BASE_DIR = Path(__file__).resolve().parent
 
 def load_wordbank(filename="wordbank.json") -> dict:
@@ -46,52 +51,93 @@ def extract_placeholders(template: str) -> list:
 
     return placeholders
 
+class Slot(NamedTuple):
+    name: str      # placeholder text as written, e.g. "nouns"
+    base: str      # singular part of speech, e.g. "noun"
+    plural: bool
+
+class TemplatePlan(NamedTuple):
+    template: str
+    literals: tuple    # always len(slots) + 1 segments
+    slots: tuple
+
+def _make_slot(name: str) -> Slot:
+    if name.endswith('s') and name[:-1] in PLURAL_BASES:
+        return Slot(name, name[:-1], True)
+    return Slot(name, name, False)
+
+@lru_cache(maxsize=4096)
+def compile_template(template: str) -> TemplatePlan:
+    """
+    Split a template once into literal segments and placeholder slots
+    ([x] and {x} both count), so rendering is a single join.
+    """
+    literals = []
+    slots = []
+    pos = 0
+    while True:
+        starts = [i for i in (template.find('[', pos), template.find('{', pos)) if i != -1]
+        if not starts:
+            break
+        start = min(starts)
+        end = template.find(']' if template[start] == '[' else '}', start)
+        if end == -1:
+            break
+        literals.append(template[pos:start])
+        slots.append(_make_slot(template[start+1:end]))
+        pos = end + 1
+    literals.append(template[pos:])
+    return TemplatePlan(template, tuple(literals), tuple(slots))
+
+def render_plan(plan: TemplatePlan, words) -> str:
+    literals = plan.literals
+    parts = [literals[0]]
+    for word, literal in zip(words, literals[1:]):
+        parts.append(word)
+        parts.append(literal)
+    return "".join(parts)
+
+class TemplateIndex:
+    """Compiled templates bucketed by slot count."""
+
+    def __init__(self, templates):
+        self.plans = tuple(compile_template(t) for t in templates)
+        buckets = {}
+        for plan in self.plans:
+            buckets.setdefault(len(plan.slots), []).append(plan)
+        self.buckets = {count: tuple(plans) for count, plans in buckets.items()}
+
+    def bucket(self, slot_count: int) -> tuple:
+        return self.buckets.get(slot_count, ())
+
+    def choose(self, slot_count: int) -> TemplatePlan:
+        bucket = self.buckets.get(slot_count)
+        if bucket:
+            return random.choice(bucket)
+        return random.choice(self.plans)  # fallback
+
+def build_template_index(templates) -> TemplateIndex:
+    return TemplateIndex(templates)
+
 # ✅ NEW: Match templates with correct number of placeholders
-def choose_matching_template(templates: list, input_letters: list) -> str:
-    matching_templates = []
-    for temp in templates:
-        placeholders = extract_placeholders(temp)
-        if len(placeholders) == len(input_letters):
-            matching_templates.append(temp)
-
-    if matching_templates:
-        return random.choice(matching_templates)
-    else:
-        return random.choice(templates)  # fallback
-
-def generate_template_sentence(template: str, wordbank: dict, input_letters: list) -> str:
-    print("\n--- DEBUGGING TEMPLATE GENERATION ---")
-    print(f"Original template: {template}")
-    print(f"Input letters: {input_letters}")
-
-    placeholders = extract_placeholders(template)
-    print(f"Detected placeholders: {placeholders}")
-
-    normalized_wordbank = {k.lower(): v for k, v in wordbank.items()}
+def choose_matching_template(templates, input_letters: list) -> str:
+    """`templates` can be a plain list or a prebuilt TemplateIndex (O(1) lookup)."""
+    if not isinstance(templates, TemplateIndex):
+        templates = build_template_index(templates)
+    return templates.choose(len(input_letters)).template
+
+def generate_template_sentence(template, wordbank, input_letters: list) -> str:
+    """`wordbank` is a WordbankIndex (preferred) or a raw wordbank dict, indexed on the fly."""
+    plan = template if isinstance(template, TemplatePlan) else compile_template(template)
+    log.debug("Template generation: template=%r letters=%s slots=%d", plan.template, input_letters, len(plan.slots))
+
+    index = build_wordbank_index(wordbank)
     used_letters = set()
 
-    for ph in placeholders:
-        plural = False
-        base_ph = ph
+    words = []
 
-        if base_ph.endswith('s') and base_ph[:-1] in ['noun', 'verb', 'adjective', 'adverb']:
-            plural = True
-            base_ph = base_ph[:-1]
-
-        base_key = base_ph.lower()
-        plural_key = base_key + 's'
-
-        if plural_key in normalized_wordbank:
-            lookup_key = plural_key
-        elif base_key in normalized_wordbank:
-            lookup_key = base_key
-        else:
-            lookup_key = None
-
-        print(f"\nHandling placeholder: {ph}")
-        print(f"Base placeholder: {base_ph}")
-        print(f"Plural: {plural}")
-        print(f"Looking in wordbank key: {lookup_key}")
+    for ph, base_ph, plural in plan.slots:
+        lookup_key = index.resolve(base_ph)
 
         selected_word = None
 
@@ -100,33 +146,17 @@ def generate_template_sentence(template: str, wordbank: dict, input_letters: lis
                 if letter in used_letters:
                     continue
 
-                letter_upper = letter.upper()
-                letter_lower = letter.lower()
-
-                matched = normalized_wordbank[lookup_key].get(letter_upper) or normalized_wordbank[lookup_key].get(letter_lower) or []
-                if matched:
-                    selected_word = random.choice(matched)
+                selected_word = index.pick(lookup_key, letter, plural)
+                if selected_word:
                     used_letters.add(letter)
-                    print(f"[✔️] Selected word '{selected_word}' for letter '{letter}'")
                     break
 
-        fallback_words = {
-            "adverb": ["fast", "well", "soon", "boldly", "kindly"],
-            "preposition": ["with", "without", "under", "over"],
-            "noun": ["thing", "idea", "item", "goal"],
-            "verb": ["go", "run", "do", "make"],
-            "adjective": ["cool", "big", "smart", "fun"]
-        }
-
         if not selected_word:
-            selected_word = random.choice(fallback_words.get(base_ph, [f"<{ph}>"]))
-            print(f"[❌] Using fallback word: {selected_word}")
-
-        if plural:
-            selected_word = p.plural(selected_word)
+            selected_word = index.fallback(base_ph, plural) or f"<{ph}>"
+            log.debug("[❌] Using fallback word %r for placeholder %r", selected_word, ph)
 
-        template = template.replace(f"[{ph}]", selected_word, 1)
-        template = template.replace(f"{{{ph}}}", selected_word, 1)
+        words.append(selected_word)
 
-    print(f"✅ Final sentence: {template}")
-    return template
+    sentence = render_plan(plan, words)
+    log.debug("✅ Final sentence: %s", sentence)
+    return sentence
@@ -1,17 +1,52 @@
 from fastapi import APIRouter, Query
-from utils import load_data
+from config import SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT
+from metrics import timed
+from search_index import get_index
 
 router = APIRouter(prefix="/search", tags=["Search"])
 
 @router.get("/")
-def search_items(category: str, query: str = Query(..., min_length=1)):
+def search_items(
+    category: str,
+    query: str = Query(..., min_length=1),
+    limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+    offset: int = Query(0, ge=0)
+):
     """
     Kisi category (actors, cricketers, animals) me se kisi item ko search karega.
-    Example: /search/?category=actors&query=Shah
+    Example: /search/?category=actors&query=Shah&limit=20&offset=0
     """
     try:
-        data = load_data(f"{category}.json")
-        results = [item for item in data if query.lower() in item.lower()]
-        return {"category": category, "query": query, "results": results}
+        with timed("search", "index_load"):
+            index = get_index(category)
     except FileNotFoundError:
         return {"error": "Category not found"}
+    with timed("search", "query"):
+        total, results = index.search(query, limit, offset)
+    return {
+        "category": category,
+        "query": query,
+        "results": results,
+        "total": total,
+        "limit": limit,
+        "offset": offset
+    }
+
+@router.get("/autocomplete")
+def autocomplete_items(
+    category: str,
+    prefix: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=SEARCH_MAX_LIMIT)
+):
+    """
+    Prefix se shuru hone wale items (naam ya naam ka koi word).
+    Example: /search/autocomplete?category=actors&prefix=sha
+    """
+    try:
+        with timed("search", "index_load"):
+            index = get_index(category)
+    except FileNotFoundError:
+        return {"error": "Category not found"}
+    with timed("search", "autocomplete"):
+        results = index.autocomplete(prefix, limit)
+    return {"category": category, "prefix": prefix, "results": results}
@@ -1,18 +1,33 @@
-import json  
+import json
 import random  
 import logging  
 import re  
+import zlib
+from typing import List, Optional
 from fastapi import APIRouter, Query  
-from pathlib import Path  
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, field_validator
 from enum import Enum  
   
-from .generate_template_sentence import generate_template_sentence, load_templates  
+import data_registry  
+from metrics import timed
+from log_config import sampled
+from config import (
+    BATCH_CHUNK_SIZE,
+    BATCH_MAX_INPUTS,
+    BATCH_MAX_VARIANTS,
+    DETERMINISTIC_TRICKS,
+    NICKNAME_PAGE_DEFAULT,
+    NICKNAME_PAGE_MAX,
+)
+from ranking import ranker_for
+from .dispatcher import GENERATORS, TrickOptions, register
+from .generate_template_sentence import generate_template_sentence, load_templates, render_plan  
   
 # Setup  
 router = APIRouter()  
 logger = logging.getLogger(__name__)  
-  
-BASE_DIR = Path(__file__).resolve().parent.parent  
+log = sampled(__name__)  # per-request events
   
 default_lines = [  
     "Iska trick abhi update nahi hua.",  
@@ -24,42 +39,20 @@ default_lines = [
 class TrickType(str, Enum):  
     abbreviations = "abbreviations"  
     generate_sentence = "generate_sentence"  
-  
-DATA_FILE_MAP = {  
-    "abbreviations": "data.json",  
-    "generate_sentence": "wordbank.json"  
-}  
-  
-TEMPLATE_FILE_MAP = {  
-    "generate_sentence": "routes/English_templates.json"  
-}  
-  
-wordbank_cache = None  
-  
-def load_json(file_key):  
-    file_path = BASE_DIR / DATA_FILE_MAP[file_key]  
-    if not file_path.exists():  
-        logger.warning(f"[{file_key.upper()}] File not found: {file_path}")  
-        return {}  
-    with file_path.open("r", encoding="utf-8") as f:  
-        raw_data = json.load(f)  
-  
-        # Normalize category keys to lowercase  
-        normalized_data = {}  
-        for key, value in raw_data.items():  
-            if isinstance(value, dict):  
-                normalized_data[key.lower()] = {k.upper(): v for k, v in value.items()}  
-            else:  
-                normalized_data[key.lower()] = value  
-        return normalized_data  
-  
-def load_template_json():  
-    file_path = BASE_DIR / TEMPLATE_FILE_MAP["generate_sentence"]  
-    if not file_path.exists():  
-        logger.warning(f"[TEMPLATES] File not found: {file_path}")  
-        return {}  
-    with file_path.open("r", encoding="utf-8") as f:  
-        return json.load(f).get("TEMPLATES_BY_LENGTH", {})  
+    nickname = "nickname"
+
+class BatchTrickRequest(BaseModel):
+    type: str = Field(..., description="Any registered trick type")
+    inputs: List[str] = Field(..., max_length=BATCH_MAX_INPUTS)
+    n: int = Field(1, ge=1, le=BATCH_MAX_VARIANTS, description="Variants per input")
+    seed: Optional[int] = Field(None, description="Same seed + inputs -> same tricks")
+
+    @field_validator("type")
+    @classmethod
+    def registered_type(cls, value):
+        if value not in GENERATORS:
+            raise ValueError(f"Unknown trick type {value!r}; expected one of: {', '.join(sorted(GENERATORS))}")
+        return value
   
 def extract_letters(input_str):  
     input_str = re.sub(r"[^a-zA-Z,\s]", "", input_str).strip()  # remove special chars
@@ -79,131 +72,252 @@ def extract_letters(input_str):
     words = re.findall(r'\b\w+', input_str)  
     return [w[0].upper() for w in words if w]  
   
-@router.get("/api/tricks")  
-def get_tricks(  
-    type: TrickType = Query(..., description="Type of trick"),  
-    letters: str = Query(..., description="Comma-separated letters or words")  
-):  
-    global wordbank_cache  
-    logger.info(f"[API] Trick Type: {type}")  
-    logger.info(f"[API] Input Letters Raw: {letters}")  
-  
-    input_parts = extract_letters(letters)  
-    logger.info(f"[DEBUG] Normalized Input Letters: {input_parts}")  
-  
-    if not input_parts:  
-        return {"trick": "Invalid input."}  
-  
-    if type == TrickType.abbreviations:  
-        data = load_json("abbreviations")  
-        nouns = data.get("nouns", {})  
-        preps = data.get("prepositions", {})  
-        trick_words = []  
+def make_rng(seed, trick_type, input_parts):
+    """
+    Seeded requests get their own Random so results are reproducible; with
+    DETERMINISTIC_TRICKS on, unseeded ones are seeded from the normalized input.
+    """
+    if seed is None and DETERMINISTIC_TRICKS:
+        seed = zlib.crc32(f"{trick_type}:{','.join(input_parts)}".encode())
+    return random.Random(seed) if seed is not None else random
+
+@register("abbreviations", extract_letters)
+def abbreviation_trick(data, input_parts, options):
+    """Alternating noun / preposition per letter."""
+    rng = make_rng(options.seed, options.type, input_parts)
+    if options.top_k:
+        return _ranked_tricks(data, TrickType.abbreviations, input_parts, options.top_k, rng)
+
+    # Short acronyms: one lookup in the precomputed table
+    if data.acronym_table is not None:
+        with timed("tricks", "acronym_table"):
+            words = data.acronym_table.pick(input_parts, rng)
+        if words is not None:
+            return {"trick": " ".join(words)}
+
+    nouns = data.nouns  
+    preps = data.prepositions  
+    trick_words = []  
   
+    with timed("tricks", "word_sampling"):
         for i, letter in enumerate(input_parts):  
             if i % 2 == 1:  
-                word_list = preps.get(letter, []) or preps.get("_default", [])  
+                word_list = data_registry.bank_words(preps, letter)
             else:  
-                word_list = nouns.get(letter, []) or nouns.get("_default", [])  
+                word_list = data_registry.bank_words(nouns, letter)
   
             if word_list:  
-                word = random.choice(word_list)  
+                word = rng.choice(word_list)  
                 trick_words.append(word)  
-                logger.info(f"[DEBUG] Selected '{word}' for letter '{letter}'")  
+                log.debug("[DEBUG] Selected '%s' for letter '%s'", word, letter)
             else:  
                 trick_words.append("???")  
   
-        trick = " ".join(trick_words)  
-  
-        if "???" in trick:  
-            return {"trick": random.choice(default_lines)}  
-        return {"trick": trick}  
-  
-    elif type == TrickType.generate_sentence:  
-        if wordbank_cache is None:  
-            wordbank_cache = load_json("generate_sentence")  
-            logger.debug(f"[LOADED WORD BANK] Categories: {list(wordbank_cache.keys())}")  
+    trick = " ".join(trick_words)  
   
-        template_data = load_template_json()  
-        letter_count = str(len(input_parts))  
-        logger.info(f"[DEBUG] Template length group: {letter_count}")  
-  
-        matching_templates = template_data.get(letter_count, [])  
-  
-        if not matching_templates:  
-            logger.warning(f"[DEBUG] No templates found for length: {letter_count}")  
-            return {"trick": "No matching templates for this input length."}  
-  
-        max_attempts = 10  
-        for attempt in range(max_attempts):  
-            template = random.choice(matching_templates)  
-            logger.info(f"[DEBUG] Attempt {attempt+1}: Trying Template: {template}")  
-  
-            placeholders = re.findall(r"\{(\w+)\}", template)  
-            logger.info(f"[DEBUG] Detected Placeholders: {placeholders}")  
-  
-            if len(placeholders) != len(input_parts):  
-                logger.info(f"[⚠️] Skipping template due to placeholder/letter mismatch.")  
-                continue  
-  
-            words = {}  
-            success = True  
-  
-            for placeholder, letter in zip(placeholders, input_parts):  
-                base = placeholder.rstrip("s").lower()  
-                category = base + "s"  
-  
-                if category not in wordbank_cache:  
-                    logger.error(f"[ERROR] Category '{category}' not found in wordbank.")  
-                    success = False  
-                    break  
-  
-                word_list = wordbank_cache[category].get(letter.upper(), []) or wordbank_cache[category].get("_default", [])  
-  
-                logger.debug(f"[DEBUG] Lookup: '{placeholder}' -> Letter: '{letter}' -> Words: {word_list}")  
-  
-                if not word_list:  
-                    logger.warning(f"[WARNING] No match found for placeholder '{placeholder}' and letter '{letter}'")  
-                    success = False  
-                    break  
-  
-                selected_word = random.choice(word_list)  
-                words[placeholder] = selected_word  
-                logger.info(f"[✔️] Selected '{selected_word}' for placeholder '{placeholder}' and letter '{letter}'")  
-  
-            if success:  
-                final_sentence = template  
-                for key, val in words.items():  
-                    final_sentence = final_sentence.replace(f"{{{key}}}", val, 1)  
-  
-                logger.info(f"[✅] Final sentence: {final_sentence}")  
-                return {"trick": final_sentence}  
-  
-        logger.error(f"[❌] All {max_attempts} attempts failed to generate sentence using all letters.")  
-        return {"trick": "Couldn't generate a sentence using all letters."}  
-  
-    return {"trick": "Invalid trick type selected."}
-
+    if "???" in trick:  
+        return {"trick": rng.choice(default_lines)}  
+    return {"trick": trick}  
 
+@register("generate_sentence", extract_letters)
+@register("nickname", extract_letters)
+def template_trick(data, input_parts, options):
+    """A sentence (or nickname) template with one word per letter."""
+    trick_type = TrickType(options.type)
+    rng = make_rng(options.seed, options.type, input_parts)
+    if options.top_k:
+        return _ranked_tricks(data, trick_type, input_parts, options.top_k, rng)
 
+    solver = _solver(data, trick_type)
+    log.debug("[DEBUG] Template slot count: %d", len(input_parts))
+  
+    # Only templates that can place every letter are considered, so one pick always succeeds
+    with timed("tricks", "template_selection"):
+        plans = solver.feasible(input_parts)
+    if not plans:
+        reason = solver.explain(input_parts)
+        logger.warning("[DEBUG] No feasible template: %s", reason)
+        return {"trick": reason}
+  
+    with timed("tricks", "word_sampling"):
+        plan = rng.choice(plans)
+        sentence = render_plan(plan, [rng.choice(words) for words in solver.word_lists(plan, input_parts)])
+  
+    log.info("[✅] Final sentence from '%s': %s", plan.template, sentence)
+    return {"trick": sentence}  
 
+class BulkSampler:
+    """
+    Collects every (word list -> output slot) request of a chunk and fills them
+    with one random.choices() call per distinct word list.
+    """
 
+    def __init__(self, rng=random):
+        self.rng = rng
+        self.pending = {}
 
+    def request(self, word_list, out, pos):
+        self.pending.setdefault(id(word_list), (word_list, []))[1].append((out, pos))
 
+    def draw(self):
+        for word_list, targets in self.pending.values():
+            picks = self.rng.choices(word_list, k=len(targets))
+            for (out, pos), word in zip(targets, picks):
+                out[pos] = word
+        self.pending.clear()
 
+def _abbreviation_slots(data, input_parts):
+    """Word list per letter (nouns on even, prepositions on odd positions) or None if a letter has no words."""
+    slots = []
+    for i, letter in enumerate(input_parts):
+        bank = data.prepositions if i % 2 == 1 else data.nouns
+        word_list = data_registry.bank_words(bank, letter)
+        if not word_list:
+            return None
+        slots.append(word_list)
+    return slots
 
+def _solver(data, trick_type):
+    """Template-based types share one interface: feasible / word_lists / explain."""
+    return data.nickname_generator if trick_type == TrickType.nickname else data.sentence_solver
 
+def _sentence_candidates(data, input_parts, trick_type=TrickType.generate_sentence):
+    """Feasible templates for the input with the word list of each slot."""
+    solver = _solver(data, trick_type)
+    return [(plan, solver.word_lists(plan, input_parts)) for plan in solver.feasible(input_parts)]
 
+def _ranked_tricks(data, trick_type, input_parts, k, rng):
+    """top_k mode: score candidates from the precomputed word lists, best first."""
+    if trick_type == TrickType.abbreviations:
+        slots = _abbreviation_slots(data, input_parts)
+        if slots is None:
+            return {"trick": rng.choice(default_lines), "tricks": []}
+        groups = [(None, slots)]
+        render = lambda plan, words: " ".join(words)
+    else:
+        groups = _sentence_candidates(data, input_parts, trick_type)
+        if not groups:
+            return {"trick": _solver(data, trick_type).explain(input_parts), "tricks": []}
+        render = render_plan
 
+    with timed("tricks", "ranking"):
+        ranked = ranker_for(data.wordbank_index).top_k(groups, k)
+    tricks = [{"trick": render(plan, words), "score": score} for score, plan, words in ranked]
+    return {"trick": tricks[0]["trick"], "tricks": tricks}
 
+# Types whose batches share one bulk word draw; any other registered type is generated one trick at a time
+BULK_TYPES = {t.value for t in TrickType}
 
+def _plan_generated(data, trick_type, input_parts, n, rng):
+    """Registered types without a bulk path: call the generator n times, each with its own seed."""
+    generator = GENERATORS[trick_type]
+    tricks = [
+        generator.generate(data, input_parts, TrickOptions(trick_type, rng.getrandbits(32), None))["trick"]
+        for _ in range(n)
+    ]
+    return lambda: tricks
 
+def _plan_batch_item(data, trick_type, input_parts, n, sampler, memo):
+    """Queue the word draws for one input; returns a render callback to run after sampler.draw()."""
+    if trick_type not in BULK_TYPES:
+        return _plan_generated(data, trick_type, input_parts, n, sampler.rng)
+    key = tuple(input_parts)
+    if trick_type == TrickType.abbreviations:
+        if key not in memo:
+            memo[key] = _abbreviation_slots(data, input_parts)
+        slots = memo[key]
+        if slots is None:
+            fallback = sampler.rng.choices(default_lines, k=n)
+            return lambda: fallback
+        variants = [[None] * len(slots) for _ in range(n)]
+        for words in variants:
+            for pos, word_list in enumerate(slots):
+                sampler.request(word_list, words, pos)
+        return lambda: [" ".join(words) for words in variants]
 
+    if key not in memo:
+        memo[key] = _sentence_candidates(data, input_parts, trick_type)
+    candidates = memo[key]
+    if not candidates:
+        reason = _solver(data, trick_type).explain(input_parts)
+        return lambda: [reason] * n
+    variants = []
+    for plan, slots in sampler.rng.choices(candidates, k=n):
+        words = [None] * len(slots)
+        for pos, word_list in enumerate(slots):
+            sampler.request(word_list, words, pos)
+        variants.append((plan, words))
+    return lambda: [render_plan(plan, words) for plan, words in variants]
 
+@timed("tricks", "batch")
+def _plan_chunk(data, request, chunk, memo, rng):
+    sampler = BulkSampler(rng)
+    planned = []
+    normalize = GENERATORS[request.type].normalize
+    for raw in chunk:
+        input_parts = normalize(raw)
+        render = None
+        if input_parts:
+            render = _plan_batch_item(data, request.type, input_parts, request.n, sampler, memo)
+        planned.append((raw, input_parts, render))
+    sampler.draw()
+    return planned
 
+def _iter_batch(request: BatchTrickRequest):
+    data = data_registry.get()  # one snapshot for the whole batch, even across a hot-reload
+    memo = {}
+    rng = random.Random(request.seed) if request.seed is not None else random
+    for start in range(0, len(request.inputs), BATCH_CHUNK_SIZE):
+        planned = _plan_chunk(data, request, request.inputs[start:start + BATCH_CHUNK_SIZE], memo, rng)
 
+        lines = []
+        for raw, input_parts, render in planned:
+            tricks = render() if render else ["Invalid input."] * request.n
+            lines.append(json.dumps({"input": raw, "letters": input_parts, "tricks": tricks}, ensure_ascii=False))
+        yield "\n".join(lines) + "\n"
 
+@router.post("/api/tricks/batch")
+def get_tricks_batch(request: BatchTrickRequest):
+    """
+    Generate tricks for many inputs in one call, streamed back as NDJSON
+    (one {"input", "letters", "tricks"} object per line, in input order).
+    """
+    return StreamingResponse(_iter_batch(request), media_type="application/x-ndjson")
 
 
+def _iter_nicknames(space, input_parts, seed, cursor, limit, reason):
+    end = cursor + limit
+    header = {
+        "letters": input_parts,
+        "seed": seed,
+        "total": space.total,
+        "cursor": cursor,
+        "next_cursor": end if end < space.total else None,
+    }
+    if reason:
+        header["reason"] = reason
+    yield json.dumps(header) + "\n"
+    for position, nickname in space.page(seed, cursor, limit):
+        yield json.dumps({"cursor": position, "trick": nickname}, ensure_ascii=False) + "\n"
 
-    
+@router.get("/api/tricks/nickname/stream")
+def stream_nicknames(
+    letters: str = Query(..., description="Comma-separated letters or words"),
+    seed: Optional[int] = Query(None, description="Fixes the order; reuse it with next_cursor to page"),
+    cursor: int = Query(0, ge=0, description="Position in the seeded order to start from"),
+    limit: int = Query(NICKNAME_PAGE_DEFAULT, ge=1, le=NICKNAME_PAGE_MAX),
+):
+    """
+    Page through every nickname for the input without materializing them,
+    as NDJSON: one header line ({"total", "seed", "next_cursor", ...}) then
+    {"cursor", "trick"} per nickname. Same seed + cursor -> same page.
+    """
+    input_parts = extract_letters(letters)
+    if seed is None:
+        seed = random.getrandbits(32)
+    generator = data_registry.get().nickname_generator
+    space = generator.space(input_parts)
+    reason = None if space.total else (generator.explain(input_parts) if input_parts else "Invalid input.")
+    return StreamingResponse(
+        _iter_nicknames(space, input_parts, seed, cursor, limit, reason), media_type="application/x-ndjson"
+    )
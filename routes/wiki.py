@@ -2,16 +2,15 @@ from fastapi import APIRouter
 from pydantic import BaseModel
 from typing import List
 from wiki_utils import fetch_abbreviation_details  # Use updated function
+from fanout import SingleFlight, resolve_unique
 
 router = APIRouter()
+_flight = SingleFlight()
 
 class WikiRequest(BaseModel):
     terms: List[str]
 
 @router.post("/wiki")
 async def get_abbreviation_info(request: WikiRequest):
-    results = {}
-    for term in request.terms:
-        details = fetch_abbreviation_details(term)
-        results[term] = details
-    return results
+    details = await resolve_unique(request.terms, fetch_abbreviation_details, _flight)
+    return {term: details[term] for term in request.terms}
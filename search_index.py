@@ -0,0 +1,163 @@
+import heapq
+import os
+import threading
+from array import array
+from bisect import bisect_left
+
+from config import DATA_PATH
+from utils import load_data
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """
+    Pre-lowered items of one category file with
+      - a trigram inverted index for substring queries (3+ chars), and
+      - a sorted (word, item id) array for prefix/autocomplete lookups via bisect.
+    Item ids are positions in the original file, so results keep file order.
+    """
+
+    def __init__(self, items):
+        self.items = tuple(str(item) for item in items)
+        self.lowered = tuple(item.lower() for item in self.items)
+
+        postings = {}
+        for item_id, text in enumerate(self.lowered):
+            for gram in _trigrams(text):
+                postings.setdefault(gram, array("I")).append(item_id)
+        self.trigrams = postings
+
+        prefixes = []
+        for item_id, text in enumerate(self.lowered):
+            prefixes.append((text, item_id))
+            prefixes.extend((word, item_id) for word in text.split()[1:])
+        prefixes.sort()
+        self.prefix_keys = [key for key, _ in prefixes]
+        self.prefix_ids = array("I", (item_id for _, item_id in prefixes))
+
+    def __len__(self):
+        return len(self.items)
+
+    def extended(self, items):
+        """
+        New index with `items` appended (ids continue after the existing ones).
+        Only the new items are tokenized; the prefix array is a linear merge.
+        """
+        index = SearchIndex.__new__(SearchIndex)
+        new_items = tuple(str(item) for item in items)
+        new_lowered = tuple(item.lower() for item in new_items)
+        first_id = len(self.items)
+        index.items = self.items + new_items
+        index.lowered = self.lowered + new_lowered
+
+        postings = dict(self.trigrams)
+        copied = set()
+        for item_id, text in enumerate(new_lowered, first_id):
+            for gram in _trigrams(text):
+                if gram not in copied:
+                    postings[gram] = array("I", postings.get(gram, ()))
+                    copied.add(gram)
+                postings[gram].append(item_id)
+        index.trigrams = postings
+
+        prefixes = []
+        for item_id, text in enumerate(new_lowered, first_id):
+            prefixes.append((text, item_id))
+            prefixes.extend((word, item_id) for word in text.split()[1:])
+        prefixes.sort()
+        merged = list(heapq.merge(zip(self.prefix_keys, self.prefix_ids), prefixes))
+        index.prefix_keys = [key for key, _ in merged]
+        index.prefix_ids = array("I", (item_id for _, item_id in merged))
+        return index
+
+    def _substring_ids(self, query):
+        if len(query) < 3:
+            return [i for i, text in enumerate(self.lowered) if query in text]
+
+        lists = []
+        for gram in _trigrams(query):
+            posting = self.trigrams.get(gram)
+            if posting is None:
+                return []
+            lists.append(posting)
+        lists.sort(key=len)
+        candidates = set(lists[0])
+        for posting in lists[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+        # Trigram hits are only candidates; confirm the full substring
+        return sorted(i for i in candidates if query in self.lowered[i])
+
+    def search(self, query, limit=50, offset=0):
+        """Case-insensitive substring search. Returns (total_matches, page_of_items)."""
+        ids = self._substring_ids(query.lower())
+        return len(ids), [self.items[i] for i in ids[offset:offset + limit]]
+
+    def autocomplete(self, prefix, limit=10):
+        """Items where the whole name or any later word starts with `prefix`; full-name matches first."""
+        prefix = prefix.lower()
+        pos = bisect_left(self.prefix_keys, prefix)
+        name_hits, word_hits, seen = [], [], set()
+        while pos < len(self.prefix_keys) and self.prefix_keys[pos].startswith(prefix):
+            item_id = self.prefix_ids[pos]
+            if item_id not in seen:
+                seen.add(item_id)
+                hits = name_hits if self.lowered[item_id].startswith(prefix) else word_hits
+                hits.append(item_id)
+            if len(name_hits) >= limit:
+                break
+            pos += 1
+        return [self.items[i] for i in (name_hits + word_hits)[:limit]]
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def _mtime(category):
+    try:
+        return os.stat(os.path.join(DATA_PATH, f"{category}.json")).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def get_index(category):
+    """
+    Return the index for data/<category>.json, building it on first use and
+    rebuilding it when the file changes. Raises FileNotFoundError like load_data.
+    """
+    mtime = _mtime(category)
+    cached = _indexes.get(category)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with _lock:
+        cached = _indexes.get(category)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        index = SearchIndex(load_data(f"{category}.json"))
+        _indexes[category] = (mtime, index)
+        return index
+
+
+def extend(category, items):
+    """
+    Append freshly ingested items to a category that is already indexed, and
+    adopt the file's new mtime so get_index() does not rebuild it from disk.
+    """
+    with _lock:
+        cached = _indexes.get(category)
+        if cached is None:
+            return None  # built from the (already merged) file on first use
+        index = cached[1].extended(items)
+        _indexes[category] = (_mtime(category), index)
+        return index
+
+
+def clear():
+    with _lock:
+        _indexes.clear()
@@ -0,0 +1,99 @@
+import itertools
+import random
+from math import prod
+
+from routes.generate_template_sentence import render_plan
+
+DEFAULT_KEY = "_DEFAULT"
+
+
+class SentenceSolver:
+    """
+    Per slot-count bucket of templates, precomputes for every position a
+    letter -> bitset-of-templates table (bit i set = template i has a word for
+    that letter at that position). The templates that can take a whole input
+    are then the AND of one bitset per position: no retries, and when nothing
+    fits we know exactly which position/letter is to blame.
+    """
+
+    def __init__(self, template_index, wordbank_index):
+        self.wordbank = wordbank_index
+        self.buckets = {}
+        for count, plans in template_index.buckets.items():
+            categories = [tuple(wordbank_index.resolve(slot.base) for slot in plan.slots) for plan in plans]
+            by_letter = [{} for _ in range(count)]
+            any_letter = [0] * count
+            for bit, cats in enumerate(categories):
+                for pos, category in enumerate(cats):
+                    if category is None:
+                        continue
+                    letters = wordbank_index.letters(category)
+                    if DEFAULT_KEY in letters:
+                        any_letter[pos] |= 1 << bit
+                    for letter in letters:
+                        if wordbank_index.words(category, letter):
+                            by_letter[pos][letter] = by_letter[pos].get(letter, 0) | (1 << bit)
+            self.buckets[count] = (plans, tuple(categories), tuple(by_letter), tuple(any_letter))
+
+    def _mask(self, letters):
+        bucket = self.buckets.get(len(letters))
+        if bucket is None:
+            return None, 0
+        plans, _, by_letter, any_letter = bucket
+        mask = (1 << len(plans)) - 1
+        for pos, letter in enumerate(letters):
+            mask &= by_letter[pos].get(letter.upper(), 0) | any_letter[pos]
+            if not mask:
+                break
+        return bucket, mask
+
+    def feasible(self, letters):
+        """Plans that can place every letter, in template order."""
+        bucket, mask = self._mask(letters)
+        if not mask:
+            return []
+        plans = bucket[0]
+        return [plans[i] for i in range(len(plans)) if mask >> i & 1]
+
+    def word_lists(self, plan, letters):
+        """Word list for each slot of a feasible plan (letter words, else the category's _default)."""
+        lists = []
+        for slot, letter in zip(plan.slots, letters):
+            category = self.wordbank.resolve(slot.base)
+            lists.append(
+                self.wordbank.words(category, letter, slot.plural)
+                or self.wordbank.words(category, DEFAULT_KEY, slot.plural)
+            )
+        return lists
+
+    def explain(self, letters):
+        """Why no template fits, as precisely as the tables allow."""
+        bucket = self.buckets.get(len(letters))
+        if bucket is None:
+            return "No matching templates for this input length."
+        _, categories, by_letter, any_letter = bucket
+        for pos, letter in enumerate(letters):
+            if not (by_letter[pos].get(letter.upper(), 0) | any_letter[pos]):
+                wanted = sorted({cats[pos] for cats in categories if cats[pos]})
+                return f"No {'/'.join(wanted) or 'known'} word starts with '{letter}' (letter {pos + 1})."
+        return "No single template can use all of these letters together."
+
+    def solve(self, letters, rng=random):
+        """Return (sentence, plan, None) or (None, None, reason)."""
+        plans = self.feasible(letters)
+        if not plans:
+            return None, None, self.explain(letters)
+        plan = rng.choice(plans)
+        words = [rng.choice(words) for words in self.word_lists(plan, letters)]
+        return render_plan(plan, words), plan, None
+
+    def count(self, letters):
+        """Number of distinct (template, words) combinations for the input."""
+        return sum(prod(len(w) for w in self.word_lists(plan, letters)) for plan in self.feasible(letters))
+
+    def enumerate(self, letters):
+        """Lazily yield (plan, words) for every feasible template and word combination."""
+        for plan in self.feasible(letters):
+            for words in itertools.product(*self.word_lists(plan, letters)):
+                yield plan, words
+
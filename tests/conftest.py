@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Top-level modules are imported by plain name, as main.py arranges for the app
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
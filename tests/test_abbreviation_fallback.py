@@ -0,0 +1,54 @@
+"""
+The abbreviation mnemonic must not depend on which path answers it: the
+precomputed acronym table, live generation, and the slot lists used by top_k
+and batches all fall back to the banks' _DEFAULT words the same way.
+"""
+import dataclasses
+import itertools
+import random
+
+import pytest
+
+import acronym_table
+import data_registry
+from routes.dispatcher import TrickOptions
+from routes.tricks import _abbreviation_slots, abbreviation_trick, default_lines
+
+MAX_LEN = 3
+
+
+@pytest.fixture(scope="module")
+def snapshots(tmp_path_factory):
+    live = data_registry.build_snapshot(use_binary=False)
+    live = dataclasses.replace(live, acronym_table=None)
+    path = tmp_path_factory.mktemp("acronyms") / "acronyms.bin"
+    table = acronym_table.AcronymTable(acronym_table.build(path, live.nouns, live.prepositions, MAX_LEN, variants=2))
+    return live, dataclasses.replace(live, acronym_table=table)
+
+
+def _keys():
+    for length in range(1, MAX_LEN + 1):
+        yield from (list(key) for key in itertools.product(acronym_table.ALPHABET, repeat=length))
+
+
+def test_table_and_live_agree_on_which_inputs_have_a_mnemonic(snapshots):
+    live, with_table = snapshots
+    options = TrickOptions("abbreviations", 1, None)
+    rng = random.Random(0)
+    mismatches = []
+    for letters in _keys():
+        from_table = with_table.acronym_table.pick(letters, rng) is not None
+        from_slots = _abbreviation_slots(live, letters) is not None
+        from_live = abbreviation_trick(live, letters, options)["trick"] not in default_lines
+        if not from_table == from_slots == from_live:
+            mismatches.append("".join(letters))
+    assert not mismatches, mismatches[:20]
+
+
+def test_letters_without_a_preposition_use_the_default_bank(snapshots):
+    live, _ = snapshots
+    missing = [letter for letter in acronym_table.ALPHABET if not live.prepositions.get(letter)]
+    assert missing, "stock data no longer has letters without prepositions"
+    letters = ["A", missing[0]]
+    trick = abbreviation_trick(live, letters, TrickOptions("abbreviations", 1, None))["trick"]
+    assert trick.split()[1] in live.prepositions[data_registry.DEFAULT_LETTER]
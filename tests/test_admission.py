@@ -0,0 +1,128 @@
+"""
+RoutePool's slot accounting (hand-off, timeout, cancellation, early rejects)
+and the client key the token buckets use.
+"""
+import asyncio
+
+import pytest
+
+from admission import Rejected, RoutePool, client_key
+
+
+async def _queued(pool):
+    """Start an acquire() that has to wait, and let it reach the queue."""
+    task = asyncio.ensure_future(pool.acquire())
+    await asyncio.sleep(0)
+    assert not task.done()
+    return task
+
+
+def test_release_hands_the_slot_to_the_next_waiter():
+    async def scenario():
+        pool = RoutePool("test", limit=1, queue_size=4, max_wait=1)
+        await pool.acquire()
+        first, second = await _queued(pool), await _queued(pool)
+        assert pool.stats()["queued"] == 2
+
+        pool.release()
+        await first
+        assert not second.done()
+        assert pool.active == 1   # handed over, never freed in between
+        assert pool.stats()["queued"] == 1
+
+        pool.release()
+        await second
+        pool.release()
+        assert pool.active == 0
+        assert pool.stats()["queued"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_waiter_times_out_and_leaves_the_queue():
+    async def scenario():
+        pool = RoutePool("test", limit=1, queue_size=4, max_wait=0.05)
+        await pool.acquire()
+        with pytest.raises(Rejected) as e:
+            await pool.acquire()
+        assert e.value.reason == "timeout"
+        assert pool.stats()["queued"] == 0
+
+        pool.release()
+        assert pool.active == 0   # nobody left to hand the slot to
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        pool = RoutePool("test", limit=1, queue_size=4, max_wait=1)
+        await pool.acquire()
+        cancelled, waiting = await _queued(pool), await _queued(pool)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        assert pool.stats()["queued"] == 1
+
+        pool.release()
+        await waiting   # the slot skipped the cancelled request
+        pool.release()
+        assert pool.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancel_after_hand_off_releases_the_slot():
+    async def scenario():
+        pool = RoutePool("test", limit=1, queue_size=4, max_wait=1)
+        await pool.acquire()
+        task = await _queued(pool)
+        pool.release()    # hands the slot over...
+        task.cancel()     # ...to a request that is cancelled before it resumes
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass          # acquire() gave the slot back itself
+        else:
+            pool.release()    # wait_for (3.11) kept the result: the caller owns the slot
+        assert pool.active == 0
+        assert pool.stats()["queued"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_and_predicted_deadline_reject_at_once():
+    async def scenario():
+        pool = RoutePool("test", limit=1, queue_size=1, max_wait=1)
+        await pool.acquire()
+        waiting = await _queued(pool)
+        with pytest.raises(Rejected) as e:
+            await pool.acquire()
+        assert e.value.reason == "queue_full"
+
+        pool.release()
+        await waiting
+        pool.service_time = 5.0   # one request ahead would already blow max_wait
+        with pytest.raises(Rejected) as e:
+            await pool.acquire()
+        assert e.value.reason == "deadline"
+        assert pool.stats()["queued"] == 0
+        pool.release()
+        assert pool.active == 0
+
+    asyncio.run(scenario())
+
+
+def _scope(peer, forwarded=None):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return {"client": (peer, 50000), "headers": headers}
+
+
+def test_client_key_believes_forwarded_for_only_from_trusted_proxies():
+    proxies = frozenset({"10.0.0.1", "10.0.0.2"})
+    assert client_key(_scope("203.0.113.9", "198.51.100.1"), proxies) == "203.0.113.9"
+    assert client_key(_scope("10.0.0.1", "198.51.100.1"), proxies) == "198.51.100.1"
+    # A forged leftmost hop is ignored; chained trusted proxies are skipped
+    assert client_key(_scope("10.0.0.1", "6.6.6.6, 198.51.100.1, 10.0.0.2"), proxies) == "198.51.100.1"
+    assert client_key(_scope("10.0.0.1"), proxies) == "10.0.0.1"
+    assert client_key({"headers": []}, proxies) == ""
@@ -0,0 +1,183 @@
+"""
+AsyncLookupClient and fetch_definition against a local stub HTTP server:
+retries, the per-host breaker, per-host concurrency and first-answer-wins.
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+import pytest
+
+import external_sources
+from external_sources import AsyncLookupClient, CircuitBreaker, CircuitOpenError
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    /ok            200
+    /flaky?n=K     503 for the first K calls, then 200
+    /down          500
+    /slow?s=SEC    200 after SEC seconds (tracks peak concurrency)
+    /ddg?q=...     DuckDuckGo-shaped JSON, /abbr?st=... Abbreviations.com-shaped HTML
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        with server.lock:
+            server.hits[url.path] = server.hits.get(url.path, 0) + 1
+            hits = server.hits[url.path]
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        try:
+            delay = float(query.get("s", server.delays.get(url.path, 0)))
+            if delay:
+                time.sleep(delay)
+            if url.path == "/flaky" and hits <= int(query.get("n", 1)):
+                self._send(503, b"busy")
+            elif url.path == "/down":
+                self._send(500, b"down")
+            elif url.path == "/ddg":
+                term = query.get("q", "")
+                self._send(200, json.dumps({"AbstractText": f"ddg {term}", "Heading": term}).encode(),
+                           "application/json")
+            elif url.path == "/abbr":
+                self._send(200, b'meaning\n<p class="desc">abbr answer</p>\n', "text/html")
+            else:
+                self._send(200, b"ok")
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _send(self, status, body, content_type="text/plain"):
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except ConnectionError:
+            pass  # the client cancelled the lookup (e.g. first-answer-wins)
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.hits = {}
+    server.delays = {}
+    server.active = server.peak = 0
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def no_persistent_cache(monkeypatch):
+    monkeypatch.setattr(external_sources, "EXTERNAL_CACHE_ENABLED", False)
+
+
+def run(coro_fn, client):
+    async def main():
+        try:
+            return await coro_fn()
+        finally:
+            await client.aclose()
+    return asyncio.run(main())
+
+
+def test_retries_transient_5xx(stub):
+    client = AsyncLookupClient(retries=2)
+    response = run(lambda: client.get(f"{stub.url}/flaky", params={"n": "2"}), client)
+    assert response.status_code == 200
+    assert stub.hits["/flaky"] == 3
+
+
+def test_gives_up_after_retries(stub):
+    client = AsyncLookupClient(retries=1)
+    with pytest.raises(httpx.HTTPStatusError):
+        run(lambda: client.get(f"{stub.url}/down"), client)
+    assert stub.hits["/down"] == 2
+
+
+def test_4xx_is_not_retried(stub):
+    class NotFound(StubHandler):
+        def do_GET(self):
+            self.server.hits["/missing"] = self.server.hits.get("/missing", 0) + 1
+            self._send(404, b"nope")
+
+    stub.RequestHandlerClass = NotFound
+    client = AsyncLookupClient(retries=2)
+    response = run(lambda: client.get(f"{stub.url}/missing"), client)
+    assert response.status_code == 404
+    assert stub.hits["/missing"] == 1
+
+
+def test_breaker_opens_then_lets_one_trial_through(stub):
+    client = AsyncLookupClient(retries=0)
+    host = urlsplit(stub.url).netloc
+    client.breakers[host] = CircuitBreaker(max_failures=2, cooldown=0.2)
+
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.get(f"{stub.url}/down")
+        assert client.breaker(host).state == "open"
+        with pytest.raises(CircuitOpenError):
+            await client.get(f"{stub.url}/ok")
+        assert "/ok" not in stub.hits  # rejected without a request
+
+        await asyncio.sleep(0.25)
+        assert client.breaker(host).state == "half-open"
+        response = await client.get(f"{stub.url}/ok")
+        assert response.status_code == 200
+        assert client.breaker(host).state == "closed"
+
+    run(scenario, client)
+
+
+def test_per_host_concurrency_limit(stub):
+    client = AsyncLookupClient(max_per_host=2, retries=0)
+
+    async def scenario():
+        responses = await asyncio.gather(*(client.get(f"{stub.url}/slow", params={"s": "0.1"}) for _ in range(6)))
+        assert all(r.status_code == 200 for r in responses)
+
+    run(scenario, client)
+    assert stub.hits["/slow"] == 6
+    assert stub.peak == 2
+
+
+def test_fetch_definition_returns_first_answer(stub, monkeypatch):
+    client = AsyncLookupClient(retries=0)
+    monkeypatch.setattr(external_sources, "client", client)
+    monkeypatch.setattr(external_sources, "DUCKDUCKGO_URL", f"{stub.url}/ddg")
+    monkeypatch.setattr(external_sources, "ABBREVIATIONS_COM_URL", f"{stub.url}/abbr")
+    stub.delays["/ddg"] = 1.0
+
+    start = time.perf_counter()
+    result = run(lambda: external_sources.fetch_definition("NASA"), client)
+    assert result == {"abbr": "NASA", "full_form": "NASA", "description": "abbr answer"}
+    assert time.perf_counter() - start < 0.9  # did not wait for the slow source
+
+
+def test_fetch_definition_skips_failed_source(stub, monkeypatch):
+    client = AsyncLookupClient(retries=0)
+    monkeypatch.setattr(external_sources, "client", client)
+    monkeypatch.setattr(external_sources, "DUCKDUCKGO_URL", f"{stub.url}/ddg")
+    monkeypatch.setattr(external_sources, "ABBREVIATIONS_COM_URL", f"{stub.url}/down")
+
+    result = run(lambda: external_sources.fetch_definition("NASA"), client)
+    assert result == {"abbr": "NASA", "full_form": "NASA", "description": "ddg NASA"}
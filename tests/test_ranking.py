@@ -0,0 +1,39 @@
+"""
+Ranker alliteration: repeated consonant sounds beyond each word's forced
+opening letter must move candidates that frequency, length and rhythm tie on.
+"""
+from ranking import Ranker, consonant_sounds
+
+
+class FlatIndex:
+    """Every word in one category, so all words get the same frequency score."""
+
+    categories = ("all",)
+
+    def __init__(self, words):
+        self._words = words
+
+    def letters(self, category):
+        return ("ALL",)
+
+    def words(self, category, letter):
+        return self._words
+
+
+def test_consonant_sounds_skip_the_opening_sound():
+    assert consonant_sounds("Chatter") == ("t", "r")
+    assert consonant_sounds("Phone") == ("n",)
+    assert consonant_sounds("Lucky") == ("k",)
+    assert consonant_sounds("Cinema") == ("n", "m")
+
+
+def test_repeated_sounds_change_the_candidate_order():
+    b_words, d_words = ["bat", "bun"], ["dot", "din"]
+    ranker = Ranker(FlatIndex(b_words + d_words))
+    ranked = [words for _, _, words in ranker.top_k([(None, [b_words, d_words])], 4)]
+
+    # Every pair ties on frequency, length and rhythm, and no two adjacent words
+    # share their first two letters, so only the tie-break ordered them before
+    assert ranked[:2] == [("bun", "din"), ("bat", "dot")]
+    assert set(ranked[2:]) == {("bun", "dot"), ("bat", "din")}
+    assert ranker.score(("bun", "din")) > ranker.score(("bun", "dot"))
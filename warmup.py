@@ -0,0 +1,53 @@
+"""
+Startup warm-up: load the data registry and touch the lazily built pieces so
+the first real request does not pay for them. See config.STARTUP_WARMUP.
+"""
+import logging
+import threading
+import time
+
+import data_registry
+
+logger = logging.getLogger(__name__)
+
+
+def warm():
+    start = time.perf_counter()
+    snapshot = data_registry.get()
+    index = snapshot.wordbank_index
+    # Placeholder -> category lookups are memoized on first use
+    for plan in snapshot.template_index.plans:
+        for slot in plan.slots:
+            index.resolve(slot.base)
+    # Fault in the word lists (mmap pages / decode cache with a binary snapshot)
+    for category in index.categories:
+        for letter in index.letters(category):
+            index.words(category, letter)
+            index.words(category, letter, plural=True)
+    logger.info("[WARMUP] Ready in %.1f ms", (time.perf_counter() - start) * 1000)
+    return snapshot
+
+
+def _run():
+    try:
+        warm()
+    except Exception:
+        # Requests will retry the load themselves through data_registry.get()
+        logger.exception("[WARMUP] Background warm-up failed")
+
+
+def start_background():
+    thread = threading.Thread(target=_run, name="startup-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def on_startup(mode):
+    """Run the configured warm-up; returns the background thread, if any."""
+    if mode == "eager":
+        warm()
+    elif mode == "background":
+        return start_background()
+    elif mode != "lazy":
+        logger.warning("[WARMUP] Unknown STARTUP_WARMUP=%r, loading lazily", mode)
+    return None
@@ -1,19 +1,32 @@
+import asyncio
+
 from fastapi import APIRouter
 from pydantic import BaseModel
-from wikipedia import fetch_wikipedia_summary
-from cache import save_to_cache
+from cache import save_many
+import external_sources
+from fanout import SingleFlight, run_blocking
 
 router = APIRouter()
+_flight = SingleFlight()
 
 class AbbrRequest(BaseModel):
     terms: list[str]
 
+def _fetch_summary(term):
+    # Runs in the fanout pool, so the heavy first import doesn't stall the event loop either
+    from wikipedia import fetch_wikipedia_summary
+    return fetch_wikipedia_summary(term)
+
+async def _resolve(term):
+    # Pooled async sources first (cached, breaker-protected); Wikipedia only for what they miss
+    return await external_sources.fetch_definition(term) or await run_blocking(_fetch_summary, term)
+
 @router.post("/fetch-abbreviations/")
-def fetch_abbreviations(request: AbbrRequest):
-    results = []
-    for term in request.terms:
-        data = fetch_wikipedia_summary(term)
-        if data:
-            save_to_cache(data)  # ye tumhara json me auto-save karega
-            results.append(data)
+async def fetch_abbreviations(request: AbbrRequest):
+    # Sab terms ek saath resolve honge (repeated terms sirf ek baar)
+    unique = list(dict.fromkeys(request.terms))
+    found = await asyncio.gather(*(_flight.do(term, lambda term=term: _resolve(term)) for term in unique))
+    results = [data for data in found if data]
+    if results:
+        await run_blocking(save_many, results)  # ek hi baar me sab json cache me save
     return {"fetched": results}
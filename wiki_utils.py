@@ -1,33 +1,45 @@
-import json
-from pathlib import Path
+import data_registry
+import metrics
+from log_config import sampled
+from abbreviation_index import normalize_term
+from config import WIKI_CACHE_SIZE, WIKI_CACHE_TTL, WIKI_NEGATIVE_TTL
+from response_cache import TTLCache
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-DATA_FILE = BASE_DIR / "data.json"
+log = sampled(__name__)
+details_cache = TTLCache(WIKI_CACHE_SIZE, WIKI_CACHE_TTL)
+metrics.register_cache("wiki_details", details_cache)
 
 def load_abbreviation_data():
-    if not DATA_FILE.exists():
-        return []
-    with open(DATA_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return list(data_registry.get().abbreviation_entries)
 
 def fetch_abbreviation_details(term: str):
-    normalized = term.replace(",", "").replace(".", "").replace(" ", "").lower()
-    print(f"[DEBUG] Normalized term: {normalized}")
+    normalized = normalize_term(term)
+    log.debug("[DEBUG] Normalized term: %s", normalized)
 
-    data = load_abbreviation_data()
+    snapshot = data_registry.get()
+    key = (snapshot.loaded_at, normalized)  # a reloaded snapshot never serves old answers
+    cached = details_cache.get(key)
+    if cached is not None:
+        return dict(cached)
 
-    for item in data:
-        abbr = item.get("abbr", "").lower()
-        if abbr == normalized:
-            return {
-                "abbr": item.get("abbr", "").upper(),
-                "full_form": item.get("full_form", ""),
-                "description": item.get("description", "")
-            }
+    item, distance = snapshot.abbreviation_index.lookup(normalized)
+
+    if item is not None:
+        details = {
+            "abbr": item.get("abbr", "").upper(),
+            "full_form": item.get("full_form", ""),
+            "description": item.get("description", "")
+        }
+        if distance:
+            details["match"] = "fuzzy"  # closest entry, not an exact hit
+        details_cache.set(key, details)
+        return dict(details)
 
     # If not found, return a fallback
-    return {
+    details = {
         "abbr": normalized.upper(),
         "full_form": "Not found",
         "description": "No definition found in local database."
     }
+    details_cache.set(key, details, ttl=WIKI_NEGATIVE_TTL)
+    return dict(details)
@@ -0,0 +1,127 @@
+import random
+from functools import lru_cache
+from types import MappingProxyType
+
+from metrics import timed
+
+EMPTY = MappingProxyType({})
+
+# Parts of speech that templates may use in plural form ({nouns}, {verbs}, ...)
+PLURAL_BASES = ('noun', 'verb', 'adjective', 'adverb')
+
+FALLBACK_WORDS = {
+    "adverb": ("fast", "well", "soon", "boldly", "kindly"),
+    "preposition": ("with", "without", "under", "over"),
+    "noun": ("thing", "idea", "item", "goal"),
+    "verb": ("go", "run", "do", "make"),
+    "adjective": ("cool", "big", "smart", "fun"),
+}
+
+
+@lru_cache(maxsize=None)
+def inflect_engine():
+    """inflect takes seconds to import; only pay for it when plurals are built from JSON."""
+    import inflect
+    return inflect.engine()
+
+
+@timed("wordbank", "pluralization")
+def _pluralize(words):
+    engine = inflect_engine()
+    return tuple(engine.plural(word) for word in words)
+
+
+class WordbankIndex:
+    """
+    category -> LETTER -> tuple of words, with plural forms precomputed for the
+    categories a plural placeholder can resolve to. Built once per data load.
+    """
+
+    def __init__(self, wordbank: dict):
+        categories = {}
+        for category, letters in wordbank.items():
+            if not isinstance(letters, dict):
+                continue
+            merged = {}
+            for letter, words in letters.items():
+                merged.setdefault(letter.upper(), []).extend(words)
+            categories[category.lower()] = MappingProxyType(
+                {letter: tuple(words) for letter, words in merged.items()}
+            )
+        self.categories = MappingProxyType(categories)
+
+        self._resolved = {}
+
+        plurals = {}
+        for base in PLURAL_BASES:
+            category = self.resolve(base)
+            if category and category not in plurals:
+                plurals[category] = MappingProxyType(
+                    {letter: _pluralize(words) for letter, words in self.categories[category].items()}
+                )
+        self.plurals = MappingProxyType(plurals)
+        self.fallback_plurals = MappingProxyType(
+            {base: _pluralize(words) for base, words in FALLBACK_WORDS.items()}
+        )
+
+    @classmethod
+    def from_tables(cls, categories, plurals, fallback_plurals):
+        """Wrap tables that were built (and pluralized) ahead of time, e.g. by binary_snapshot."""
+        index = cls.__new__(cls)
+        index.categories = MappingProxyType(dict(categories))
+        index.plurals = MappingProxyType(dict(plurals))
+        index.fallback_plurals = MappingProxyType(dict(fallback_plurals))
+        index._resolved = {}
+        return index
+
+    def with_words(self, additions):
+        """
+        New index with {category: {LETTER: new words}} appended; only the new
+        words are pluralized, everything untouched is shared with this index.
+        """
+        categories = dict(self.categories)
+        plurals = dict(self.plurals)
+        for category, letters in additions.items():
+            merged = dict(categories.get(category, EMPTY))
+            merged_plurals = dict(plurals[category]) if category in plurals else None
+            for letter, words in letters.items():
+                merged[letter] = merged.get(letter, ()) + tuple(words)
+                if merged_plurals is not None:
+                    merged_plurals[letter] = merged_plurals.get(letter, ()) + _pluralize(tuple(words))
+            categories[category] = MappingProxyType(merged)
+            if merged_plurals is not None:
+                plurals[category] = MappingProxyType(merged_plurals)
+        return WordbankIndex.from_tables(categories, plurals, self.fallback_plurals)
+
+    def resolve(self, base: str):
+        """Placeholder base ("noun") -> wordbank category ("nouns"), plural key first."""
+        try:
+            return self._resolved[base]
+        except KeyError:
+            pass
+        key = base.lower()
+        category = next((k for k in (key + 's', key) if k in self.categories), None)
+        self._resolved[base] = category
+        return category
+
+    def words(self, category: str, letter: str, plural: bool = False) -> tuple:
+        table = self.plurals if plural and category in self.plurals else self.categories
+        return table.get(category, EMPTY).get(letter.upper(), ())
+
+    def pick(self, category: str, letter: str, plural: bool = False, rng=random):
+        words = self.words(category, letter, plural)
+        return rng.choice(words) if words else None
+
+    def fallback(self, base: str, plural: bool = False, rng=random):
+        table = self.fallback_plurals if plural else FALLBACK_WORDS
+        words = table.get(base)
+        return rng.choice(words) if words else None
+
+    def letters(self, category: str):
+        return self.categories.get(category, EMPTY).keys()
+
+
+def build_wordbank_index(wordbank) -> WordbankIndex:
+    if isinstance(wordbank, WordbankIndex):
+        return wordbank
+    return WordbankIndex(wordbank)
@@ -0,0 +1,56 @@
+"""
+Cross-worker reload broadcast for `uvicorn main:app --workers N`.
+
+A generation counter lives in an 8-byte file that every worker maps with
+mmap, so reading it is a shared-memory load (no syscall) and cheap enough to
+do on every data_registry.get(). A worker that reloads bumps the counter
+under an exclusive flock; the others see the new value on their next request
+and reload too. Read-only data is already shared through the page cache by
+the mmap'd binary snapshot, and abbreviation-cache writes are serialized by
+cache.AbbreviationStore's flock + append-only log.
+"""
+import logging
+import mmap
+import struct
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: single worker only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+COUNTER = struct.Struct("<Q")
+
+
+class GenerationCounter:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a+b") as f:
+            if f.seek(0, 2) < COUNTER.size:
+                f.write(b"\0" * (COUNTER.size - f.tell()))
+        self._file = open(self.path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), COUNTER.size)
+
+    def value(self):
+        return COUNTER.unpack_from(self._map, 0)[0]
+
+    def bump(self):
+        """Increment and return the new generation; atomic across processes."""
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        try:
+            generation = self.value() + 1
+            COUNTER.pack_into(self._map, 0, generation)
+            self._map.flush()
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+        logger.info("[WORKER_SYNC] Data generation -> %d", generation)
+        return generation
+
+    def close(self):
+        self._map.close()
+        self._file.close()